@@ -44,6 +44,11 @@ import multiprocessing
 
 if __name__=='__main__':
     multiprocessing.freeze_support()
+    # libvips is not fork-safe, so use spawn when it is the slide backend.
+    # Otherwise, keep the platform default (e.g. spawn on macOS, where
+    # forking is unsafe with system frameworks).
+    if sf.slide_backend() == 'libvips':
+        multiprocessing.set_start_method('spawn', force=True)
     parser = argparse.ArgumentParser(
         description=__doc__,
         formatter_class=argparse.RawTextHelpFormatter
@@ -84,20 +84,24 @@ overview of the structure of ``Dataset`` is as follows:
 
 import copy
 import csv
+import errno
 import multiprocessing as mp
 import os
 import shutil
+import sys
 import threading
 import time
 import types
 import tempfile
 import warnings
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from glob import glob
+from itertools import chain
 from multiprocessing.dummy import Pool as DPool
 from os.path import basename, dirname, exists, isdir, join
-from queue import Queue
+from queue import Empty, Queue
 from random import shuffle
 from tabulate import tabulate  # type: ignore[import]
 from pprint import pformat
@@ -234,10 +238,45 @@ def _tile_extractor(
         raise e
 
 
+# Buffer size for slide copies that cannot use os.sendfile. Small buffers
+# pipeline better on network (NFS/SMB) filesystems than shutil's 1 MiB.
+_SLIDE_COPY_BUFSIZE = int(os.environ.get('SF_COPY_BUFSIZE', 64 * 1024))
+
+
+def _copy_slide_file(src: str, dst: str) -> None:
+    """Copy a slide file, using in-kernel os.sendfile on Linux.
+
+    Falls back to a buffered copy (``SF_COPY_BUFSIZE`` bytes at a time,
+    default 64 KiB) on other platforms, or if the filesystem does not support
+    sendfile. File permissions are copied.
+    """
+    if sys.platform.startswith('linux') and hasattr(os, 'sendfile'):
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+            size = os.fstat(in_fd).st_size
+            offset = 0
+            try:
+                while offset < size:
+                    sent = os.sendfile(
+                        out_fd, in_fd, offset, min(size - offset, 2 ** 30)
+                    )
+                    if sent == 0:
+                        break
+                    offset += sent
+            except OSError as e:
+                if offset or e.errno not in (errno.EINVAL, errno.ENOTSUP):
+                    raise
+                shutil.copyfileobj(fsrc, fdst, _SLIDE_COPY_BUFSIZE)
+    else:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            shutil.copyfileobj(fsrc, fdst, _SLIDE_COPY_BUFSIZE)
+    shutil.copymode(src, dst)
+
+
 def _buffer_slide(path: str, dest: str) -> str:
     """Buffer a slide to a path."""
     buffered = join(dest, basename(path))
-    shutil.copy(path, buffered)
+    _copy_slide_file(path, buffered)
 
     # If this is an MRXS file, copy the associated folder.
     if path.lower().endswith('mrxs'):
@@ -265,31 +304,116 @@ def _debuffer_slide(path: str) -> None:
 def _fill_queue(
     slide_list: Sequence[str],
     q: Queue,
-    q_size: int,
-    buffer: Optional[str] = None
+    buffer: Optional[str] = None,
+    slots: Optional[threading.Semaphore] = None,
+    stop: Optional[threading.Event] = None
 ) -> None:
-    """Fill a queue with slide paths, using an optional buffer."""
+    """Fill a queue with slide paths, using an optional buffer.
+
+    If ``slots`` is provided, a permit is acquired before each slide is
+    copied to the buffer. The consumer should release it once the buffered
+    copy has been removed, so the buffer never holds more slides than the
+    semaphore has permits. If ``stop`` is set, no further slides are
+    queued; slides already queued are left for the consumer to remove
+    (see :func:`_drain_slide_queue`).
+    """
+    def _stopped():
+        return stop is not None and stop.is_set()
+
     for path in slide_list:
         warned = False
+        if _stopped():
+            return
         if buffer:
+            if slots is not None:
+                while not slots.acquire(timeout=1):
+                    if _stopped():
+                        return
             while True:
-                if q.qsize() < q_size:
-                    try:
-                        q.put(_buffer_slide(path, buffer))
-                        break
-                    except OSError:
-                        if not warned:
-                            slide = _shortname(path_to_name(path))
-                            log.debug(f'OSError for {slide}: buffer full?')
-                            log.debug(f'Queue size: {q.qsize()}')
-                            warned = True
-                        time.sleep(1)
-                else:
+                try:
+                    buffered = _buffer_slide(path, buffer)
+                    break
+                except OSError:
+                    if _stopped():
+                        if slots is not None:
+                            slots.release()
+                        return
+                    if not warned:
+                        slide = _shortname(path_to_name(path))
+                        log.debug(f'OSError for {slide}: buffer full?')
+                        log.debug(f'Queue size: {q.qsize()}')
+                        warned = True
                     time.sleep(1)
+            q.put(buffered)
         else:
             q.put(path)
     q.put(None)
-    q.join()
+
+
+def _drain_slide_queue(
+    q: Queue,
+    slots: Optional[threading.Semaphore] = None
+) -> None:
+    """Remove buffered slides left in a queue after extraction stops early."""
+    while True:
+        try:
+            path = q.get_nowait()
+        except Empty:
+            return
+        if path is not None:
+            _debuffer_slide(path)
+            if slots is not None:
+                slots.release()
+
+
+# Parsed manifest.json files, keyed by path. Entries are validated against
+# the file's modification time and size, so on-disk updates are picked up.
+_MANIFEST_CACHE = {}  # type: Dict[str, Tuple[int, int, Dict]]
+
+
+def _load_manifest(path: str) -> Dict[str, Dict[str, int]]:
+    """Load a tfrecord manifest, reusing the parsed result if unchanged."""
+    stat = os.stat(path)
+    cached = _MANIFEST_CACHE.get(path)
+    if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+        try:
+            import orjson
+        except ImportError:
+            data = sf.util.load_json(path)
+        else:
+            with open(path, 'rb') as f:
+                data = orjson.loads(f.read())
+        cached = (stat.st_mtime_ns, stat.st_size, data)
+        _MANIFEST_CACHE[path] = cached
+    # Return copies of the per-tfrecord entries, which callers may modify.
+    return {k: dict(v) for k, v in cached[2].items()}
+
+
+def _points_in_polygons(
+    polygons: List[sg.Polygon],
+    xs: np.ndarray,
+    ys: np.ndarray
+) -> np.ndarray:
+    """Return a boolean mask of points that lie inside any of the polygons."""
+    try:
+        from shapely import contains_xy
+    except ImportError:
+        # Shapely < 2.0
+        from shapely.vectorized import contains as contains_xy
+    inside = np.zeros(len(xs), dtype=bool)
+    for poly in polygons:
+        inside |= contains_xy(poly, xs, ys)
+    return inside
+
+
+def _all_float(values: Sequence) -> bool:
+    """Check if all values can be converted to float."""
+    try:
+        for v in values:
+            float(v)
+        return True
+    except ValueError:
+        return False
 
 
 def _count_otsu_tiles(wsi):
@@ -342,9 +466,9 @@ def split_patients_preserved_site(
         ]
     else:
         patient_outcome_labels = [1 for _ in patient_list]
-    # Get unique outcomes
-    unique_labels = list(set(patient_outcome_labels))
-    n_unique = len(set(unique_labels))
+    # Get unique outcomes, in a deterministic (first-seen) order
+    unique_labels = list(dict.fromkeys(patient_outcome_labels))
+    n_unique = len(unique_labels)
     # Delayed import in case CPLEX not installed
     import slideflow.io.preservedsite.crossfolds as cv
 
@@ -394,23 +518,17 @@ def split_patients_balanced(
     patient_list = list(patients_dict.keys())
     shuffle(patient_list)
 
-    def flatten(arr):
-        """Flatten an array."""
-        return [y for x in arr for y in x]
+    # Group patients by outcome label in a single pass
+    patients_by_label = defaultdict(list)  # type: Dict[Any, List[str]]
+    for p in patient_list:
+        patients_by_label[patients_dict[p][balance]].append(p)
 
-    # Get patient outcome labels
-    patient_outcome_labels = [
-        patients_dict[p][balance] for p in patient_list
-    ]
-    # Get unique outcomes
-    unique_labels = list(set(patient_outcome_labels))
-    n_unique = len(set(unique_labels))
+    # Get unique outcomes, in a deterministic (first-seen) order
+    unique_labels = list(patients_by_label)
+    n_unique = len(unique_labels)
 
     # Now, split patient_list according to outcomes
-    pt_by_outcome = [
-        [p for p in patient_list if patients_dict[p][balance] == uo]
-        for uo in unique_labels
-    ]
+    pt_by_outcome = [patients_by_label[uo] for uo in unique_labels]
     # Then, for each sublist, split into n components
     pt_by_outcome_by_n = [
         list(sf.util.split_list(sub_l, n)) for sub_l in pt_by_outcome
@@ -424,9 +542,8 @@ def split_patients_balanced(
         log.info(f"K-fold-{k}\t" + "\t".join(matching))
     # Join sublists
     splits = [
-        flatten([
-            item[ni] for item in pt_by_outcome_by_n
-        ]) for ni in range(n)
+        list(chain.from_iterable(item[ni] for item in pt_by_outcome_by_n))
+        for ni in range(n)
     ]
     return splits
 
@@ -563,6 +680,7 @@ class Dataset:
         self.prob_weights = None  # type: Optional[Dict]
         self._annotations = None  # type: Optional[pd.DataFrame]
         self.annotations_file = None  # type: Optional[str]
+        self._labels_cache = {}  # type: Dict[Tuple, Labels]
 
         if (any(arg is not None for arg in (tfrecords, tiles, roi, slides))
            and (config is not None or sources is not None)):
@@ -617,6 +735,25 @@ class Dataset:
         if annotations is not None:
             self.load_annotations(annotations)
 
+    def __copy__(self) -> "Dataset":
+        """Return a copy sharing annotations and source configuration.
+
+        Annotations, sources, and tile settings are never modified in place
+        after initialization, so they are shared with the copy. Only the
+        mutable filter, clipping, and balancing state is duplicated (filters
+        deeply, as their values may be lists). The categorical labels cache
+        is keyed by filter state and reset when annotations are reloaded, so
+        it is also shared.
+        """
+        ret = type(self).__new__(type(self))
+        ret.__dict__.update(self.__dict__)
+        ret._filters = copy.deepcopy(self._filters)
+        ret._filter_blank = list(self._filter_blank)
+        ret._clip = dict(self._clip)
+        if self.prob_weights is not None:
+            ret.prob_weights = dict(self.prob_weights)
+        return ret
+
     def __repr__(self) -> str:   # noqa D105
         _b = "Dataset(config={!r}, sources={!r}, tile_px={!r}, tile_um={!r})"
         return _b.format(
@@ -761,6 +898,8 @@ class Dataset:
         Raises:
             errors.AnnotationsError: If annotations are incorrectly formatted.
         """
+        # Labels cached for the previous annotations are no longer valid.
+        self._labels_cache = {}
         if isinstance(annotations, str):
             if not exists(annotations):
                 raise errors.AnnotationsError(
@@ -815,6 +954,24 @@ class Dataset:
                 f"Duplicate slides found in annotations: {dup_slides}."
             )
 
+    def _categorical_labels(self, headers: Union[str, List[str]]) -> Labels:
+        """Return categorical slide labels for balancing and clipping.
+
+        Results are cached per headers and filter state. The cache is shared
+        with copies made by filtering, balancing, or clipping, so chained
+        calls such as ``.balance('site').clip(strategy='category', ...)``
+        only scan the annotations once.
+        """
+        if self.min_tiles:
+            # Filtering depends on the on-disk manifest; do not cache.
+            return self.labels(headers, use_float=False)[0]
+        key = (tuple(sf.util.as_list(headers)),
+               repr(sorted(self._filters.items())),
+               tuple(self._filter_blank))
+        if key not in self._labels_cache:
+            self._labels_cache[key] = self.labels(headers, use_float=False)[0]
+        return self._labels_cache[key]
+
     def balance(
         self,
         headers: Optional[Union[str, List[str]]] = None,
@@ -862,10 +1019,10 @@ class Dataset:
         Returns:
             balanced :class:`slideflow.Dataset` object.
         """
-        ret = copy.deepcopy(self)
+        ret = copy.copy(self)
         manifest = ret.manifest()
         tfrecords = ret.tfrecords()
-        slides = [path_to_name(tfr) for tfr in tfrecords]
+        slides = {path_to_name(tfr) for tfr in tfrecords}
         totals = {
             tfr: (manifest[tfr]['total']
                   if 'clipped' not in manifest[tfr]
@@ -911,34 +1068,28 @@ class Dataset:
                     "To force balancing with these outcomes, pass "
                     "`force=True` to Dataset.balance()"
                 )
-            labels, _ = ret.labels(headers, use_float=False)
-            cats = {}  # type: Dict[str, Dict]
+            labels = ret._categorical_labels(headers)
             cat_prob = {}
             tfr_cats = {}  # type: Dict[str, str]
             for tfrecord in tfrecords:
-                slide = path_to_name(tfrecord)
-                balance_cat = sf.util.as_list(labels[slide])
-                balance_cat_str = '-'.join(map(str, balance_cat))
-                tfr_cats[tfrecord] = balance_cat_str
-                tiles = totals[tfrecord]
-                if balance_cat_str not in cats:
-                    cats.update({balance_cat_str: {
-                        'num_slides': 1,
-                        'num_tiles': tiles
-                    }})
-                else:
-                    cats[balance_cat_str]['num_slides'] += 1
-                    cats[balance_cat_str]['num_tiles'] += tiles
+                balance_cat = sf.util.as_list(labels[path_to_name(tfrecord)])
+                tfr_cats[tfrecord] = '-'.join(map(str, balance_cat))
+            cat_df = pd.DataFrame({
+                'tfr': tfrecords,
+                'cat': [tfr_cats[tfr] for tfr in tfrecords],
+                'tiles': [totals[tfr] for tfr in tfrecords]
+            })
+            cats = cat_df.groupby('cat', sort=False).agg(
+                num_slides=('tfr', 'size'),
+                num_tiles=('tiles', 'sum')
+            ).to_dict('index')  # type: Dict[str, Dict]
+            min_cat_slides = min(c['num_slides'] for c in cats.values())
             for category in cats:
-                min_cat_slides = min([
-                    cats[i]['num_slides'] for i in cats
-                ])
                 slides_in_cat = cats[category]['num_slides']
                 cat_prob[category] = min_cat_slides / slides_in_cat
-            total_prob = sum([cat_prob[tfr_cats[tfr]] for tfr in tfrecords])
-            ret.prob_weights = {
-                tfr: cat_prob[tfr_cats[tfr]]/total_prob for tfr in tfrecords
-            }
+            tfr_prob = cat_df['cat'].map(cat_prob).to_numpy(dtype=float)
+            tfr_prob /= tfr_prob.sum()
+            ret.prob_weights = dict(zip(tfrecords, tfr_prob.tolist()))
         return ret
 
     def build_index(self, force: bool = True) -> None:
@@ -1083,54 +1234,61 @@ class Dataset:
         )
         q = Queue()  # type: Queue
         if buffer:
+            slots = threading.Semaphore(q_size)
+            stop = threading.Event()
             thread = threading.Thread(
                 target=_fill_queue,
-                args=(slide_list, q, q_size, buffer))
+                args=(slide_list, q, buffer, slots, stop))
             thread.start()
 
         pb.start()
         with sf.util.cleanup_progress(pb):
-            while True:
-                slide_path = q.get()
-                if slide_path is None:
-                    q.task_done()
-                    break
-                wsi = sf.WSI(
-                    slide_path,
-                    tile_px=window_size,
-                    tile_um=tile_um,
-                    verbose=False
-                )
-                if qc is not None:
-                    wsi.qc(qc, **qc_kwargs)
-                segment_task = pb.add_task(
-                    "Segmenting... ",
-                    progress_type="slide_progress",
-                    total=wsi.estimated_num_tiles
-                )
-                # Perform segmentation and save
-                segmentation = segment_slide(
-                    wsi,
-                    pb=pb,
-                    pb_tasks=[speed_task, segment_task],
-                    show_progress=False,
-                    model=model,
-                    diam_mean=diam_mean,
-                    save_flow=save_flow,
-                    **kwargs)
-                mask_dest = dest if dest is not None else dirname(slide_path)
-                segmentation.save(
-                    join(mask_dest, f'{wsi.name}-masks.zip'),
-                    flows=save_flow,
-                    centroids=save_centroid)
-                pb.advance(slide_task)
-                pb.remove_task(segment_task)
+            try:
+                while True:
+                    slide_path = q.get()
+                    if slide_path is None:
+                        q.task_done()
+                        break
+                    wsi = sf.WSI(
+                        slide_path,
+                        tile_px=window_size,
+                        tile_um=tile_um,
+                        verbose=False
+                    )
+                    if qc is not None:
+                        wsi.qc(qc, **qc_kwargs)
+                    segment_task = pb.add_task(
+                        "Segmenting... ",
+                        progress_type="slide_progress",
+                        total=wsi.estimated_num_tiles
+                    )
+                    # Perform segmentation and save
+                    segmentation = segment_slide(
+                        wsi,
+                        pb=pb,
+                        pb_tasks=[speed_task, segment_task],
+                        show_progress=False,
+                        model=model,
+                        diam_mean=diam_mean,
+                        save_flow=save_flow,
+                        **kwargs)
+                    mask_dest = dest if dest is not None else dirname(slide_path)
+                    segmentation.save(
+                        join(mask_dest, f'{wsi.name}-masks.zip'),
+                        flows=save_flow,
+                        centroids=save_centroid)
+                    pb.advance(slide_task)
+                    pb.remove_task(segment_task)
 
+                    if buffer:
+                        _debuffer_slide(slide_path)
+                        slots.release()
+                    q.task_done()
+            finally:
                 if buffer:
-                    _debuffer_slide(slide_path)
-                q.task_done()
-        if buffer:
-            thread.join()
+                    stop.set()
+                    thread.join()
+                    _drain_slide_queue(q, slots)
 
     def check_duplicates(
         self,
@@ -1217,7 +1375,7 @@ class Dataset:
             :class:`slideflow.Dataset` object.
 
         """
-        ret = copy.deepcopy(self)
+        ret = copy.copy(self)
         ret._filters = {}
         ret._filter_blank = []
         ret._min_tiles = 0
@@ -1258,10 +1416,10 @@ class Dataset:
         if not max_tiles and strategy is None:
             return self.unclip()
 
-        ret = copy.deepcopy(self)
+        ret = copy.copy(self)
         manifest = ret.manifest()
         tfrecords = ret.tfrecords()
-        slides = [path_to_name(tfr) for tfr in tfrecords]
+        slides = {path_to_name(tfr) for tfr in tfrecords}
         totals = {tfr: manifest[tfr]['total'] for tfr in tfrecords}
 
         if not tfrecords:
@@ -1303,7 +1461,7 @@ class Dataset:
         elif strategy == 'category':
             if headers is None:
                 raise ValueError("Category clipping requires arg `headers`")
-            labels, _ = ret.labels(headers, use_float=False)
+            labels = ret._categorical_labels(headers)
             categories = {}
             cat_fraction = {}
             tfr_cats = {}
@@ -1318,13 +1476,16 @@ class Dataset:
                 else:
                     categories[balance_cat_str] += tiles
 
+            min_cat_count = min(categories.values())
             for category in categories:
-                min_cat_count = min([categories[i] for i in categories])
                 cat_fraction[category] = min_cat_count / categories[category]
-            ret._clip = {
-                tfr: int(totals[tfr] * cat_fraction[tfr_cats[tfr]])
-                for tfr in manifest
-            }
+            clip_tfrs = list(manifest)
+            clip_totals = np.array([totals[t] for t in clip_tfrs], dtype=np.int64)
+            clip_fractions = pd.Series(cat_fraction).reindex(
+                [tfr_cats[t] for t in clip_tfrs]
+            ).to_numpy()
+            clipped = (clip_totals * clip_fractions).astype(np.int64)
+            ret._clip = dict(zip(clip_tfrs, clipped.tolist()))
         elif max_tiles:
             ret._clip = {
                 tfr: (max_tiles if totals[tfr] > max_tiles else totals[tfr])
@@ -1545,221 +1706,262 @@ class Dataset:
         kwargs = {k: v for k, v in kwargs.items() if k[:3] != 'qc_'}
         sf.slide.log_extraction_params(**kwargs)
 
-        for source in sources:
-            log.info(f'Working on dataset source [bold]{source}[/]...')
-            if self._roi_set(source):
-                roi_dir = self.sources[source]['roi']
-            else:
-                roi_dir = None
-            src_conf = self.sources[source]
-            if 'dry_run' not in kwargs or not kwargs['dry_run']:
-                if save_tfrecords and not self._tfrecords_set(source):
-                    log.error(f"tfrecords path not set for source {source}")
-                    continue
-                elif save_tfrecords:
-                    tfrecord_dir = join(
-                        src_conf['tfrecords'],
-                        src_conf['label']
-                    )
-                else:
-                    tfrecord_dir = None
-                if save_tiles and not self._tiles_set(source):
-                    log.error(f"tiles path not set for source {source}")
-                    continue
-                elif save_tiles:
-                    tiles_dir = join(src_conf['tiles'], src_conf['label'])
-                else:
-                    tiles_dir = None
-                if save_tfrecords and not exists(tfrecord_dir):
-                    os.makedirs(tfrecord_dir)
-                if save_tiles and not exists(tiles_dir):
-                    os.makedirs(tiles_dir)
-            else:
-                save_tfrecords, save_tiles = False, False
-                tfrecord_dir, tiles_dir = None, None
+        # Forking incompatible with some libvips configurations
+        ptype = 'spawn' if sf.slide_backend() == 'libvips' else 'fork'
+        ctx = mp.get_context(ptype)
+        if 'num_threads' not in kwargs:
+            num_threads = sf.util.num_cpu()
+            if num_threads is None:
+                num_threads = 8
+            if sf.slide_backend() == 'libvips':
+                num_threads = min(num_threads, 32)
+        else:
+            num_threads = kwargs['num_threads']
 
-            # Prepare list of slides for extraction
-            slide_list = self.slide_paths(source=source)
+        # The multiprocessing pool and manager are created on first use and
+        # shared across all sources, so worker processes (and their imports)
+        # are only started once per extraction.
+        pool = None
+        manager = None
 
-            # Check for interrupted or already-extracted tfrecords
-            if skip_extracted and save_tfrecords:
-                done = [
-                    path_to_name(tfr) for tfr in self.tfrecords(source=source)
-                ]
-                _dir = tfrecord_dir if tfrecord_dir else tiles_dir
-                unfinished = glob(join((_dir), '*.unfinished'))
-                interrupted = [path_to_name(marker) for marker in unfinished]
-                if len(interrupted):
-                    log.info(f'Re-extracting {len(interrupted)} interrupted:')
-                    for interrupted_slide in interrupted:
-                        log.info(interrupted_slide)
-                        if interrupted_slide in done:
-                            del done[done.index(interrupted_slide)]
-
-                slide_list = [
-                    s for s in slide_list if path_to_name(s) not in done
-                ]
-                if len(done):
-                    log.info(f'Skipping {len(done)} slides; already done.')
-            _tail = f"(tile_px={self.tile_px}, tile_um={self.tile_um})"
-            log.info(f'Extracting tiles from {len(slide_list)} slides {_tail}')
-
-            # Use multithreading if specified, extracting tiles
-            # from all slides in the filtered list
-            if len(slide_list):
-                q = Queue()  # type: Queue
-                # Forking incompatible with some libvips configurations
-                ptype = 'spawn' if sf.slide_backend() == 'libvips' else 'fork'
-                ctx = mp.get_context(ptype)
-                manager = ctx.Manager()
-                reports = manager.dict()
-                kwargs['report'] = report
-
-                # Use a single shared multiprocessing pool
-                if 'num_threads' not in kwargs:
-                    num_threads = sf.util.num_cpu()
-                    if num_threads is None:
-                        num_threads = 8
-                    if sf.slide_backend() == 'libvips':
-                        num_threads = min(num_threads, 32)
-                else:
-                    num_threads = kwargs['num_threads']
-                if num_threads != 1:
-                    pool = kwargs['pool'] = ctx.Pool(
-                        num_threads,
-                        initializer=sf.util.set_ignore_sigint
-                    )
-                    qc_kwargs['pool'] = pool
+        try:
+            for source in sources:
+                log.info(f'Working on dataset source [bold]{source}[/]...')
+                if self._roi_set(source):
+                    roi_dir = self.sources[source]['roi']
                 else:
-                    pool = None
-                    ptype = None
-                log.info(f'Using {num_threads} processes (pool={ptype})')
-
-                # Set up the multiprocessing progress bar
-                pb = TileExtractionProgress()
-                pb.add_task(
-                    "Speed: ",
-                    progress_type="speed",
-                    total=None)
-                slide_task = pb.add_task(
-                    "Extracting...",
-                    progress_type="slide_progress",
-                    total=len(slide_list))
-
-                wsi_kwargs = {
-                    'tile_px': self.tile_px,
-                    'tile_um': self.tile_um,
-                    'stride_div': stride_div,
-                    'enable_downsample': enable_downsample,
-                    'roi_dir': roi_dir,
-                    'roi_method': roi_method,
-                    'roi_filter_method': roi_filter_method,
-                    'randomize_origin': randomize_origin,
-                    'pb': pb
-                }
-                extraction_kwargs = {
-                    'tfrecord_dir': tfrecord_dir,
-                    'tiles_dir': tiles_dir,
-                    'reports': reports,
-                    'tma': tma,
-                    'qc': qc,
-                    'generator_kwargs': kwargs,
-                    'qc_kwargs': qc_kwargs,
-                    'wsi_kwargs': wsi_kwargs,
-                    'render_thumb': (buffer is not None)
-                }
-                pb.start()
-                with sf.util.cleanup_progress(pb):
-                    if buffer:
-                        # Start the worker threads
-                        thread = threading.Thread(
-                            target=_fill_queue,
-                            args=(slide_list, q, q_size, buffer))
-                        thread.start()
-
-                        # Grab slide path from queue and start extraction
-                        while True:
-                            path = q.get()
-                            if path is None:
-                                q.task_done()
-                                break
-                            _tile_extractor(path, **extraction_kwargs)
-                            pb.advance(slide_task)
-                            _debuffer_slide(path)
-                            q.task_done()
-                        thread.join()
+                    roi_dir = None
+                src_conf = self.sources[source]
+                if 'dry_run' not in kwargs or not kwargs['dry_run']:
+                    if save_tfrecords and not self._tfrecords_set(source):
+                        log.error(f"tfrecords path not set for source {source}")
+                        continue
+                    elif save_tfrecords:
+                        tfrecord_dir = join(
+                            src_conf['tfrecords'],
+                            src_conf['label']
+                        )
                     else:
-                        for slide in slide_list:
-                            wsi = _prepare_slide(
-                                slide,
-                                report_dir=tfrecord_dir,
-                                tma=tma,
-                                wsi_kwargs=wsi_kwargs,
-                                qc=qc,
-                                qc_kwargs=qc_kwargs)
-                            if wsi is None:
-                                pb.advance(slide_task)
-                                continue
+                        tfrecord_dir = None
+                    if save_tiles and not self._tiles_set(source):
+                        log.error(f"tiles path not set for source {source}")
+                        continue
+                    elif save_tiles:
+                        tiles_dir = join(src_conf['tiles'], src_conf['label'])
+                    else:
+                        tiles_dir = None
+                    if save_tfrecords and not exists(tfrecord_dir):
+                        os.makedirs(tfrecord_dir)
+                    if save_tiles and not exists(tiles_dir):
+                        os.makedirs(tiles_dir)
+                else:
+                    save_tfrecords, save_tiles = False, False
+                    tfrecord_dir, tiles_dir = None, None
+
+                # Prepare list of slides for extraction
+                slide_list = self.slide_paths(source=source)
+
+                # Check for interrupted or already-extracted tfrecords
+                if skip_extracted and save_tfrecords:
+                    done = {
+                        path_to_name(tfr) for tfr in self.tfrecords(source=source)
+                    }
+                    _dir = tfrecord_dir if tfrecord_dir else tiles_dir
+                    with os.scandir(_dir) as entries:
+                        interrupted = [
+                            path_to_name(entry.name) for entry in entries
+                            if entry.name.endswith('.unfinished')
+                        ]
+                    if len(interrupted):
+                        log.info(f'Re-extracting {len(interrupted)} interrupted:')
+                        for interrupted_slide in interrupted:
+                            log.info(interrupted_slide)
+                            done.discard(interrupted_slide)
+
+                    slide_list = [
+                        s for s in slide_list if path_to_name(s) not in done
+                    ]
+                    if len(done):
+                        log.info(f'Skipping {len(done)} slides; already done.')
+                _tail = f"(tile_px={self.tile_px}, tile_um={self.tile_um})"
+                log.info(f'Extracting tiles from {len(slide_list)} slides {_tail}')
+
+                # Use multithreading if specified, extracting tiles
+                # from all slides in the filtered list
+                if len(slide_list):
+                    q = Queue()  # type: Queue
+                    if manager is None:
+                        manager = ctx.Manager()
+                    reports = manager.dict()
+                    kwargs['report'] = report
+
+                    # Use a single shared multiprocessing pool
+                    if num_threads != 1 and pool is None:
+                        pool = kwargs['pool'] = ctx.Pool(
+                            num_threads,
+                            initializer=sf.util.set_ignore_sigint
+                        )
+                        qc_kwargs['pool'] = pool
+                    log.info('Using {} processes (pool={})'.format(
+                        num_threads, ptype if pool is not None else None
+                    ))
+
+                    # Set up the multiprocessing progress bar
+                    pb = TileExtractionProgress()
+                    pb.add_task(
+                        "Speed: ",
+                        progress_type="speed",
+                        total=None)
+                    slide_task = pb.add_task(
+                        "Extracting...",
+                        progress_type="slide_progress",
+                        total=len(slide_list))
+
+                    wsi_kwargs = {
+                        'tile_px': self.tile_px,
+                        'tile_um': self.tile_um,
+                        'stride_div': stride_div,
+                        'enable_downsample': enable_downsample,
+                        'roi_dir': roi_dir,
+                        'roi_method': roi_method,
+                        'roi_filter_method': roi_filter_method,
+                        'randomize_origin': randomize_origin,
+                        'pb': pb
+                    }
+                    extraction_kwargs = {
+                        'tfrecord_dir': tfrecord_dir,
+                        'tiles_dir': tiles_dir,
+                        'reports': reports,
+                        'tma': tma,
+                        'qc': qc,
+                        'generator_kwargs': kwargs,
+                        'qc_kwargs': qc_kwargs,
+                        'wsi_kwargs': wsi_kwargs,
+                        'render_thumb': (buffer is not None)
+                    }
+                    pb.start()
+                    with sf.util.cleanup_progress(pb):
+                        if buffer:
+                            # Start the worker threads. A buffer slot is held
+                            # from copying a slide until its copy is removed.
+                            slots = threading.Semaphore(q_size)
+                            stop = threading.Event()
+                            thread = threading.Thread(
+                                target=_fill_queue,
+                                args=(slide_list, q, buffer, slots, stop))
+                            thread.start()
+
+                            def _remove_buffered(path):
+                                try:
+                                    _debuffer_slide(path)
+                                finally:
+                                    slots.release()
+
+                            # Grab slide path from queue and start extraction.
+                            # Buffered copies are removed in the background so
+                            # the next slide can start immediately. If
+                            # extraction fails, the producer is stopped and any
+                            # remaining buffered slides are removed.
+                            removals = []
                             try:
-                                log.debug(f'Extracting tiles for {wsi.name}')
-                                wsi_report = wsi.extract_tiles(
-                                    tfrecord_dir=tfrecord_dir,
-                                    tiles_dir=tiles_dir,
-                                    **kwargs
-                                )
-                                reports.update({wsi.path: wsi_report})
-                                del wsi
-                            except errors.TileCorruptionError:
-                                log.error(f'{wsi.path} corrupt; skipping')
-                            pb.advance(slide_task)
-
-                # Generate PDF report.
-                if report:
-                    log.info('Generating PDF (this may take some time)...', )
-                    rep_vals = list(
-                        reports.copy().values()
-                    )  # type: List[SlideReport]
-                    all_reports += rep_vals
-                    num_slides = len(slide_list)
-                    img_kwargs = defaultdict(lambda: None)  # type: Dict
-                    img_kwargs.update(kwargs)
-                    img_kwargs = sf.slide._update_kw_with_defaults(img_kwargs)
-                    report_meta = types.SimpleNamespace(
-                        tile_px=self.tile_px,
-                        tile_um=self.tile_um,
-                        qc=qc,
-                        total_slides=num_slides,
-                        slides_skipped=len([r for r in rep_vals if r is None]),
-                        roi_method=roi_method,
-                        stride=stride_div,
-                        gs_frac=img_kwargs['grayspace_fraction'],
-                        gs_thresh=img_kwargs['grayspace_threshold'],
-                        ws_frac=img_kwargs['whitespace_fraction'],
-                        ws_thresh=img_kwargs['whitespace_threshold'],
-                        normalizer=img_kwargs['normalizer'],
-                        img_format=img_kwargs['img_format']
-                    )
-                    pdf_report = ExtractionReport(
-                        [r for r in rep_vals if r is not None],
-                        meta=report_meta,
-                        pool=pool
-                    )
-                    _time = datetime.now().strftime('%Y%m%d-%H%M%S')
-                    pdf_dir = tfrecord_dir if tfrecord_dir else ''
-                    pdf_report.save(
-                        join(pdf_dir, f'tile_extraction_report-{_time}.pdf')
-                    )
-                    pdf_report.update_csv(
-                        join(pdf_dir, 'extraction_report.csv')
-                    )
-                    warn_path = join(pdf_dir, f'warn_report-{_time}.txt')
-                    if pdf_report.warn_txt:
-                        with open(warn_path, 'w') as warn_f:
-                            warn_f.write(pdf_report.warn_txt)
+                                cleanup = ThreadPoolExecutor(max_workers=1)
+                                with cleanup:
+                                    while True:
+                                        path = q.get()
+                                        if path is None:
+                                            q.task_done()
+                                            break
+                                        try:
+                                            _tile_extractor(
+                                                path, **extraction_kwargs
+                                            )
+                                        finally:
+                                            removals.append(cleanup.submit(
+                                                _remove_buffered, path
+                                            ))
+                                        pb.advance(slide_task)
+                                        q.task_done()
+                            finally:
+                                stop.set()
+                                thread.join()
+                                _drain_slide_queue(q, slots)
+                            # Surface any errors from removing buffered slides.
+                            for removal in removals:
+                                removal.result()
+                        else:
+                            for slide in slide_list:
+                                wsi = _prepare_slide(
+                                    slide,
+                                    report_dir=tfrecord_dir,
+                                    tma=tma,
+                                    wsi_kwargs=wsi_kwargs,
+                                    qc=qc,
+                                    qc_kwargs=qc_kwargs)
+                                if wsi is None:
+                                    pb.advance(slide_task)
+                                    continue
+                                try:
+                                    log.debug(f'Extracting tiles for {wsi.name}')
+                                    wsi_report = wsi.extract_tiles(
+                                        tfrecord_dir=tfrecord_dir,
+                                        tiles_dir=tiles_dir,
+                                        **kwargs
+                                    )
+                                    reports.update({wsi.path: wsi_report})
+                                    del wsi
+                                except errors.TileCorruptionError:
+                                    log.error(f'{wsi.path} corrupt; skipping')
+                                pb.advance(slide_task)
 
-                # Close the multiprocessing pool.
-                if pool is not None:
-                    pool.close()
+                    # Generate PDF report.
+                    if report:
+                        log.info('Generating PDF (this may take some time)...', )
+                        rep_vals = list(
+                            reports.copy().values()
+                        )  # type: List[SlideReport]
+                        all_reports += rep_vals
+                        num_slides = len(slide_list)
+                        img_kwargs = defaultdict(lambda: None)  # type: Dict
+                        img_kwargs.update(kwargs)
+                        img_kwargs = sf.slide._update_kw_with_defaults(img_kwargs)
+                        report_meta = types.SimpleNamespace(
+                            tile_px=self.tile_px,
+                            tile_um=self.tile_um,
+                            qc=qc,
+                            total_slides=num_slides,
+                            slides_skipped=len([r for r in rep_vals if r is None]),
+                            roi_method=roi_method,
+                            stride=stride_div,
+                            gs_frac=img_kwargs['grayspace_fraction'],
+                            gs_thresh=img_kwargs['grayspace_threshold'],
+                            ws_frac=img_kwargs['whitespace_fraction'],
+                            ws_thresh=img_kwargs['whitespace_threshold'],
+                            normalizer=img_kwargs['normalizer'],
+                            img_format=img_kwargs['img_format']
+                        )
+                        pdf_report = ExtractionReport(
+                            [r for r in rep_vals if r is not None],
+                            meta=report_meta,
+                            pool=pool
+                        )
+                        _time = datetime.now().strftime('%Y%m%d-%H%M%S')
+                        pdf_dir = tfrecord_dir if tfrecord_dir else ''
+                        pdf_report.save(
+                            join(pdf_dir, f'tile_extraction_report-{_time}.pdf')
+                        )
+                        pdf_report.update_csv(
+                            join(pdf_dir, 'extraction_report.csv')
+                        )
+                        warn_path = join(pdf_dir, f'warn_report-{_time}.txt')
+                        if pdf_report.warn_txt:
+                            with open(warn_path, 'w') as warn_f:
+                                warn_f.write(pdf_report.warn_txt)
+        finally:
+            # Close the multiprocessing pool and manager.
+            if pool is not None:
+                pool.close()
+            if manager is not None:
+                manager.shutdown()
 
         # Update manifest & rebuild indices
         self.update_manifest(force_update=True)
@@ -1827,7 +2029,7 @@ class Dataset:
         for kwarg in kwargs:
             if kwarg not in ('filters', 'filter_blank', 'min_tiles'):
                 raise ValueError(f'Unknown filtering argument {kwarg}')
-        ret = copy.deepcopy(self)
+        ret = copy.copy(self)
         if 'filters' in kwargs and kwargs['filters'] is not None:
             if not isinstance(kwargs['filters'], dict):
                 raise TypeError("'filters' must be a dict.")
@@ -1971,12 +2173,7 @@ class Dataset:
         """
         if self.annotations is None:
             raise errors.DatasetError("Annotations not loaded.")
-        filtered_labels = self.filtered_annotations[header]
-        try:
-            filtered_labels = [float(o) for o in filtered_labels]
-            return True
-        except ValueError:
-            return False
+        return _all_float(self.filtered_annotations[header])
 
     def kfold_split(
         self,
@@ -2075,15 +2272,17 @@ class Dataset:
         """
         if self.annotations is None:
             raise errors.DatasetError("Annotations not loaded.")
-        if not len(self.filtered_annotations):
+        # Filtering is recomputed on every access, so only filter once.
+        filtered_ann = self.filtered_annotations
+        if not len(filtered_ann):
             raise errors.DatasetError(
                 "Cannot generate labels: dataset is empty after filtering."
             )
         results = {}  # type: Dict
         headers = sf.util.as_list(headers)
         unique_labels = {}
-        filtered_pts = self.filtered_annotations.patient
-        filtered_slides = self.filtered_annotations.slide
+        filtered_pts = filtered_ann.patient
+        filtered_slides = filtered_ann.slide
         for header in headers:
             if assign and (len(headers) > 1 or header in assign):
                 assigned_for_header = assign[header]
@@ -2095,8 +2294,9 @@ class Dataset:
             else:
                 assigned_for_header = None
             unique_labels_for_this_header = []
+            label_index = {}  # type: Dict[Any, int]
             try:
-                filtered_labels = self.filtered_annotations[header]
+                filtered_labels = filtered_ann[header]
             except KeyError:
                 raise errors.AnnotationsError(f"Missing column {header}.")
 
@@ -2110,13 +2310,13 @@ class Dataset:
             elif isinstance(use_float, bool):
                 header_is_float = use_float
             elif use_float == 'auto':
-                header_is_float = self.is_float(header)
+                header_is_float = _all_float(filtered_labels)
             else:
                 raise ValueError(f"Invalid use_float option {use_float}")
 
             # Ensure labels can be converted to desired type,
             # then assign values
-            if header_is_float and not self.is_float(header):
+            if header_is_float and not _all_float(filtered_labels):
                 raise TypeError(
                     f"Unable to convert all labels of {header} into 'float' "
                     f"({','.join(filtered_labels)})."
@@ -2126,10 +2326,11 @@ class Dataset:
                 filtered_labels = filtered_labels.astype(float)
             else:
                 log.debug(f'Interpreting column "{header}" as categorical')
-                unique_labels_for_this_header = list(set(filtered_labels))
-                unique_labels_for_this_header.sort()
+                unique_labels_for_this_header = sorted(set(filtered_labels))
+                label_counts = filtered_labels.value_counts().to_dict()
                 for i, ul in enumerate(unique_labels_for_this_header):
-                    n_matching_filtered = sum(f == ul for f in filtered_labels)
+                    label_index[ul] = i
+                    n_matching_filtered = label_counts[ul]
                     if assigned_for_header and ul not in assigned_for_header:
                         raise KeyError(
                             f"assign was provided, but label {ul} missing"
@@ -2152,7 +2353,7 @@ class Dataset:
                 elif format == 'name':
                     return o
                 else:
-                    return unique_labels_for_this_header.index(o)
+                    return label_index[o]
 
             # Check for multiple, different labels per patient and warn
             pt_assign = np.array(list(set(zip(filtered_pts, filtered_labels))))
@@ -2237,21 +2438,20 @@ class Dataset:
                 sf.io.update_manifest_at_dir(tfrecord_dir)
 
             if exists(manifest_path):
-                relative_manifest = sf.util.load_json(manifest_path)
+                relative_manifest = _load_manifest(manifest_path)
             else:
                 relative_manifest = {}
-            global_manifest = {}
-            for record in relative_manifest:
-                k = join(tfrecord_dir, record)
-                global_manifest.update({k: relative_manifest[record]})
-            all_manifest.update(global_manifest)
+            all_manifest.update({
+                join(tfrecord_dir, record): entry
+                for record, entry in relative_manifest.items()
+            })
         # Now filter out any tfrecords that would be excluded by filters
         if filter:
-            filtered_tfrecords = self.tfrecords()
-            manifest_tfrecords = list(all_manifest.keys())
-            for tfr in manifest_tfrecords:
-                if tfr not in filtered_tfrecords:
-                    del all_manifest[tfr]
+            filtered_tfrecords = set(self.tfrecords())
+            all_manifest = {
+                tfr: entry for tfr, entry in all_manifest.items()
+                if tfr in filtered_tfrecords
+            }
         # Log clipped tile totals if applicable
         for tfr in all_manifest:
             if tfr in self._clip:
@@ -2329,10 +2529,8 @@ class Dataset:
         if self.annotations is None:
             raise errors.DatasetError("Annotations not loaded.")
         result = {}  # type: Dict[str, str]
-        pairs = list(zip(
-            self.filtered_annotations['slide'],
-            self.filtered_annotations['patient']
-        ))
+        filtered_ann = self.filtered_annotations
+        pairs = list(zip(filtered_ann['slide'], filtered_ann['patient']))
         for slide, patient in pairs:
             if slide in result and result[slide] != patient:
                 raise errors.AnnotationsError(
@@ -2355,7 +2553,7 @@ class Dataset:
                 do not have a \*.pt file.
 
         """
-        slides = self.slides()
+        slides = set(self.slides())
         if isinstance(path, str):
             path = [path]
 
@@ -2430,7 +2628,7 @@ class Dataset:
         for kwarg in kwargs:
             if kwarg not in ('filters', 'filter_blank'):
                 raise ValueError(f'Unknown filtering argument {kwarg}')
-        ret = copy.deepcopy(self)
+        ret = copy.copy(self)
         if 'filters' in kwargs:
             if isinstance(kwargs['filters'], str):
                 kwargs['filters'] = [kwargs['filters']]
@@ -2493,14 +2691,18 @@ class Dataset:
 
     def rois(self) -> List[str]:
         """Return a list of all ROIs."""
-        rois_list = []
+        rois_set = set()
         for source in self.sources:
             if self._roi_set(source):
-                rois_list += glob(join(self.sources[source]['roi'], "*.csv"))
+                rois_set.update(
+                    e.path
+                    for e in sf.util._scandir_visible(self.sources[source]['roi'])
+                    if e.name.endswith('.csv') and e.is_file()
+                )
             else:
                 log.warning(f"roi path not set for source {source}")
-        slides = self.slides()
-        return [r for r in list(set(rois_list)) if path_to_name(r) in slides]
+        slides = set(self.slides())
+        return [r for r in rois_set if path_to_name(r) in slides]
 
     def slide_manifest(
         self,
@@ -2544,6 +2746,7 @@ class Dataset:
                 "tile_px and tile_um must be set to calculate a slide manifest"
             )
         paths = self.slide_paths(source=source)
+        rois = self.rois()
         pb = Progress(transient=True)
         read_task = pb.add_task('Reading slides...', total=len(paths))
         if not low_memory:
@@ -2570,7 +2773,7 @@ class Dataset:
                         path,
                         self.tile_px,
                         self.tile_um,
-                        rois=self.rois(),
+                        rois=rois,
                         stride_div=stride_div,
                         roi_method=roi_method,
                         verbose=False)
@@ -2638,7 +2841,7 @@ class Dataset:
         paths = list(set(paths))
         # Filter paths
         if apply_filters:
-            filtered_slides = self.slides()
+            filtered_slides = set(self.slides())
             filtered_paths = [
                 p for p in paths if path_to_name(p) in filtered_slides
             ]
@@ -3010,10 +3213,8 @@ class Dataset:
                 f"not match number of training slides ({len(train_slides)}). "
                 "This may happen if multiple tfrecords were found for a slide."
             )
-        training_dts = copy.deepcopy(self)
-        training_dts = training_dts.filter(filters={'slide': train_slides})
-        val_dts = copy.deepcopy(self)
-        val_dts = val_dts.filter(filters={'slide': val_slides})
+        training_dts = self.filter(filters={'slide': train_slides})
+        val_dts = self.filter(filters={'slide': val_slides})
         if not skip_tfr_verification and not from_wsi:
             assert sorted(training_dts.tfrecords()) == sorted(training_tfr)
             assert sorted(val_dts.tfrecords()) == sorted(val_tfr)
@@ -3092,20 +3293,23 @@ class Dataset:
             out_path = join(destination, 'outside', f'{slidename}.tfrecords')
             inside_roi_writer = sf.io.TFRecordWriter(in_path)
             outside_roi_writer = sf.io.TFRecordWriter(out_path)
-            for record in track(reader, total=manifest[tfr]['total']):
-                parsed = parser(record)
-                loc_x, loc_y = parsed['loc_x'], parsed['loc_y']
-                tile_in_roi = any([
-                    annPoly.contains(sg.Point(loc_x, loc_y))
-                    for annPoly in slide.annPolys
-                ])
-                # Convert from a Tensor -> Numpy array
-                if hasattr(record, 'numpy'):
-                    record = record.numpy()
-                if tile_in_roi:
-                    inside_roi_writer.write(record)
-                else:
-                    outside_roi_writer.write(record)
+            records = track(reader, total=manifest[tfr]['total'])
+            for record_batch in sf.util.batch_generator(records, 1024):
+                # Test all tile locations in the batch against the ROIs at once
+                locs = [parser(record) for record in record_batch]
+                in_roi = _points_in_polygons(
+                    slide.annPolys,
+                    np.array([p['loc_x'] for p in locs], dtype=np.float64),
+                    np.array([p['loc_y'] for p in locs], dtype=np.float64)
+                )
+                for record, tile_in_roi in zip(record_batch, in_roi):
+                    # Convert from a Tensor -> Numpy array
+                    if hasattr(record, 'numpy'):
+                        record = record.numpy()
+                    if tile_in_roi:
+                        inside_roi_writer.write(record)
+                    else:
+                        outside_roi_writer.write(record)
             inside_roi_writer.close()
             outside_roi_writer.close()
 
@@ -3197,6 +3401,10 @@ class Dataset:
 
                 Combine letters to define augmentations, such as ``'xyrjn'``.
                 A value of True will use ``'xyrjb'``.
+            cache (bool or str, optional): Cache decoded (and stain normalized)
+                images, in memory if True, or to this file path if a str.
+                Augmentation is applied after the cache. Only supported for
+                finite datasets (``infinite=False``). Defaults to False.
             deterministic (bool, optional): When num_parallel_calls is specified,
                 if this boolean is specified, it controls the order in which the
                 transformation produces elements. If set to False, the
@@ -3219,13 +3427,23 @@ class Dataset:
             img_size (int): Image width in pixels.
             normalizer (:class:`slideflow.norm.StainNormalizer`, optional):
                 Normalizer to use on images. Defaults to None.
-            num_parallel_reads (int, optional): Number of parallel reads for each
-                TFRecordDataset. Defaults to 4.
+            num_parallel_reads (int or str, optional): Number of parallel
+                reads for each TFRecordDataset. If ``'auto'``, the Tensorflow
+                runtime tunes this value dynamically. Parallel maps and the
+                final prefetch always use ``tf.data.AUTOTUNE``.
+                Defaults to ``tf.data.AUTOTUNE``.
             num_shards (int, optional): Shard the tfrecord datasets, used for
                 multiprocessing datasets. Defaults to None.
             pool (multiprocessing.Pool): Shared multiprocessing pool. Useful
                 if ``from_wsi=True``, for sharing a unified processing pool between
                 dataloaders. Defaults to None.
+            prefetch_device (str, optional): Prefetch batches onto this device
+                (e.g. ``'/gpu:0'``), overlapping the host-to-device copy with
+                the preceding step. Defaults to None (prefetch on host).
+            read_buffer_size (int, optional): Number of bytes to buffer when
+                reading each TFRecord. Larger buffers reduce read stalls when
+                TFRecords are on network or cloud storage. Defaults to None
+                (Tensorflow default, 256 KB).
             rois (list(str), optional): List of ROI paths. Only used if
                 from_wsi=True.  Defaults to None.
             roi_method (str, optional): Method for extracting ROIs. Only used if
@@ -3301,10 +3519,9 @@ class Dataset:
             log.info(f'Using realtime {normalizer.method} normalization')
 
         tfrecord_list = self.tfrecords()
-        reports = []
         log.info('Generating TFRecords report...')
-        # Get images for report
-        for tfr in track(tfrecord_list, description='Generating report...'):
+
+        def sample_report(tfr):
             dataset = sf.io.TFRecordDataset(tfr)
             parser = sf.io.get_tfrecord_parser(
                 tfr,
@@ -3313,7 +3530,7 @@ class Dataset:
                 decode_images=False
             )
             if not parser:
-                continue
+                return None
             sample_tiles = []
             for i, record in enumerate(dataset):
                 if i > 9:
@@ -3322,11 +3539,21 @@ class Dataset:
                 if normalizer:
                     image_raw_data = normalizer.jpeg_to_jpeg(image_raw_data)
                 sample_tiles += [image_raw_data]
-            reports += [SlideReport(sample_tiles,
-                                    tfr,
-                                    tile_px=self.tile_px,
-                                    tile_um=self.tile_um,
-                                    ignore_thumb_errors=True)]
+            return SlideReport(sample_tiles,
+                               tfr,
+                               tile_px=self.tile_px,
+                               tile_um=self.tile_um,
+                               ignore_thumb_errors=True)
+
+        # Get images for report, reading tfrecords concurrently.
+        pool = DPool(sf.util.num_cpu(default=8))
+        reports = [
+            r for r in track(pool.imap(sample_report, tfrecord_list),
+                             total=len(tfrecord_list),
+                             description='Generating report...')
+            if r is not None
+        ]
+        pool.close()
 
         # Generate and save PDF
         log.info('Generating PDF (this may take some time)...')
@@ -3423,7 +3650,7 @@ class Dataset:
 
         # Filter the list by filters
         if self.annotations is not None:
-            slides = self.slides()
+            slides = set(self.slides())
             filtered_tfrecords_list = [
                 tfrecord for tfrecord in tfrecords_list
                 if path_to_name(tfrecord) in slides
@@ -3775,7 +4002,7 @@ class Dataset:
             :class:`slideflow.Dataset`: Dataset with clips removed.
 
         """
-        ret = copy.deepcopy(self)
+        ret = copy.copy(self)
         ret._clip = {}
         return ret
 
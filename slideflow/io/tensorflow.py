@@ -7,7 +7,7 @@ from functools import partial
 from glob import glob
 from os import listdir
 from os.path import exists, isfile, join
-from random import randint, shuffle
+from random import shuffle
 from rich.progress import track, Progress
 from rich import print as richprint
 from typing import (TYPE_CHECKING, Any, Callable, Dict, Iterable, List,
@@ -32,6 +32,10 @@ FEATURE_DESCRIPTION = {
     'loc_y': tf.io.FixedLenFeature([], tf.int64)
 }
 
+# Maximum number of tfrecords read concurrently by a parallel interleave,
+# when the number of parallel reads is autotuned.
+_MAX_INTERLEAVE_CYCLE = 16
+
 
 def _bytes_feature(value: bytes) -> "Feature":
     """Returns a bytes_list from a string / byte."""
@@ -48,6 +52,35 @@ def _apply_otsu(wsi):
     return wsi
 
 
+def _is_batch_safe(
+    augment: Union[bool, str],
+    transform: Optional[Callable] = None
+) -> bool:
+    """Check if augmentations can be applied to a batch of images at once."""
+    if transform is not None or augment is True:
+        return False
+    if not augment:
+        return True
+    return all(a in 'xyrn' for a in augment)
+
+
+def _random_rot90_batch(images: tf.Tensor) -> tf.Tensor:
+    """Rotate each image in a batch of square images by a random multiple
+    of 90 degrees, matching ``tf.image.rot90``."""
+    k = tf.random.uniform(
+        [tf.shape(images)[0], 1, 1, 1],
+        minval=0,
+        maxval=4,
+        dtype=tf.int32
+    )
+    # Rotating by k * 90 degrees is a transpose (odd k), followed by a
+    # vertical flip (k = 1, 2) and a horizontal flip (k = 2, 3).
+    images = tf.where(k % 2 == 1, tf.transpose(images, [0, 2, 1, 3]), images)
+    images = tf.where((k == 1) | (k == 2), tf.reverse(images, [1]), images)
+    images = tf.where(k >= 2, tf.reverse(images, [2]), images)
+    return images
+
+
 def read_and_return_record(
     record: bytes,
     parser: Callable,
@@ -145,6 +178,10 @@ def process_image(
 ) -> Tuple[Union[Dict, tf.Tensor], ...]:
     """Applies augmentations and/or standardization to an image Tensor.
 
+    Accepts either a single image (rank 3) or a batch of images (rank 4).
+    Random flips, rotations, and standardization are applied per-image in
+    both cases. Batched rotation requires square images.
+
     Args:
         record (Union[tf.Tensor, Dict[str, tf.Tensor]]): Image Tensor.
 
@@ -171,7 +208,9 @@ def process_image(
         image = record['tile_image']
     else:
         image = record
-    if size is not None:
+    if size is not None and image.shape.rank == 4:
+        image.set_shape([None, size, size, 3])
+    elif size is not None:
         image.set_shape([size, size, 3])
     if augment is True or (isinstance(augment, str) and 'j' in augment):
         # Augment with random compession
@@ -192,10 +231,13 @@ def process_image(
                         false_fn=lambda: image)
     if augment is True or (isinstance(augment, str) and 'r' in augment):
         # Rotate randomly 0, 90, 180, 270 degrees
-        image = tf.image.rot90(
-            image,
-            tf.random.uniform(shape=[], minval=0, maxval=4, dtype=tf.int32)
-        )  # pylint: disable=unexpected-keyword-arg
+        if image.shape.rank == 4:
+            image = _random_rot90_batch(image)
+        else:
+            image = tf.image.rot90(
+                image,
+                tf.random.uniform(shape=[], minval=0, maxval=4, dtype=tf.int32)
+            )  # pylint: disable=unexpected-keyword-arg
         # Random flip and rotation
     if augment is True or (isinstance(augment, str) and 'x' in augment):
         image = tf.image.random_flip_left_right(image)
@@ -278,14 +320,25 @@ def decode_image(
         'jpeg': tf.image.decode_jpeg,
         'jpg': tf.image.decode_jpeg
     }
-    decoder = tf_decoders[img_type.lower()]
-    image = decoder(img_string, channels=3)
-    if crop_left is not None:
+    if crop_left is not None and img_type.lower() in ('jpg', 'jpeg'):
+        # Only decode the cropped region of JPEG images.
+        image = tf.image.decode_and_crop_jpeg(
+            img_string,
+            [crop_left, crop_left, crop_width, crop_width],
+            channels=3
+        )
+    elif crop_left is not None:
+        image = tf_decoders[img_type.lower()](img_string, channels=3)
         image = tf.image.crop_to_bounding_box(
             image, crop_left, crop_left, crop_width, crop_width
         )
+    else:
+        image = tf_decoders[img_type.lower()](img_string, channels=3)
     if resize_target is not None:
         image = tf.image.resize(image, (resize_target, resize_target), method=resize_method, antialias=resize_aa)
+        # Keep the pipeline uint8 until standardization, truncating as in
+        # preprocess_uint8().
+        image = tf.cast(tf.clip_by_value(image, 0, 255), tf.uint8)
         image.set_shape([resize_target, resize_target, 3])
     elif size:
         image.set_shape([size, size, 3])
@@ -403,24 +456,27 @@ def parser_from_labels(labels: Labels) -> Callable:
     slides = list(labels.keys())
     if len(outcome_labels.shape) == 1:
         outcome_labels = np.expand_dims(outcome_labels, axis=1)
+    # The final row holds the default label (-1) for unknown slides.
+    default_labels = np.full(
+        (1, outcome_labels.shape[1]), -1, dtype=outcome_labels.dtype
+    )
     with tf.device('/cpu'):
-        annotations_tables = []
-        for oi in range(outcome_labels.shape[1]):
-            annotations_tables += [tf.lookup.StaticHashTable(
-                tf.lookup.KeyValueTensorInitializer(
-                    slides,
-                    outcome_labels[:, oi]
-                ), -1
-            )]
+        slide_index_table = tf.lookup.StaticHashTable(
+            tf.lookup.KeyValueTensorInitializer(
+                slides,
+                np.arange(len(slides), dtype=np.int64)
+            ), len(slides)
+        )
+        label_tensor = tf.constant(
+            np.concatenate([outcome_labels, default_labels])
+        )
 
     def label_parser(image, slide):
+        labels = tf.gather(label_tensor, slide_index_table.lookup(slide))
         if outcome_labels.shape[1] > 1:
-            label = [
-                annotations_tables[oi].lookup(slide)
-                for oi in range(outcome_labels.shape[1])
-            ]
+            label = [labels[oi] for oi in range(outcome_labels.shape[1])]
         else:
-            label = annotations_tables[0].lookup(slide)
+            label = labels[0]
         return image, label
 
     return label_parser
@@ -431,6 +487,7 @@ def interleave(
     *,
     augment: bool = False,
     batch_size: Optional[int],
+    cache: Union[bool, str] = False,
     clip: Optional[Dict[str, int]] = None,
     deterministic: bool = False,
     drop_last: bool = False,
@@ -441,10 +498,12 @@ def interleave(
     img_size: int,
     labels: Optional[Labels] = None,
     normalizer: Optional["StainNormalizer"] = None,
-    num_parallel_reads: int = 4,
+    num_parallel_reads: Union[int, str] = tf.data.AUTOTUNE,
     num_shards: Optional[int] = None,
     pool: Optional["mp.pool.Pool"] = None,
+    prefetch_device: Optional[str] = None,
     prob_weights: Optional[Dict[str, float]] = None,
+    read_buffer_size: Optional[int] = None,
     rois: Optional[List[str]] = None,
     roi_method: str = 'auto',
     shard_idx: Optional[int] = None,
@@ -477,6 +536,10 @@ def interleave(
             Combine letters to define augmentations, such as ``'xyrjn'``.
             A value of True will use ``'xyrjb'``.
         batch_size (int): Batch size.
+        cache (bool or str, optional): Cache decoded (and stain normalized)
+            images, in memory if True, or to this file path if a str.
+            Augmentation is applied after the cache. Only supported for
+            finite datasets (``infinite=False``). Defaults to False.
         clip (dict, optional): Dict mapping tfrecords to number of tiles to
             take per tfrecord. Defaults to None.
         deterministic (bool, optional): When num_parallel_calls is specified,
@@ -506,15 +569,25 @@ def interleave(
             provided,  all labels will be None.
         normalizer (:class:`slideflow.norm.StainNormalizer`, optional):
             Normalizer to use on images. Defaults to None.
-        num_parallel_reads (int, optional): Number of parallel reads for each
-            TFRecordDataset. Defaults to 4.
+        num_parallel_reads (int or str, optional): Number of parallel reads
+            for each TFRecordDataset. If ``'auto'``, the Tensorflow runtime
+            tunes this value dynamically. Defaults to ``tf.data.AUTOTUNE``.
+            Parallel maps and the final prefetch always use
+            ``tf.data.AUTOTUNE``.
         num_shards (int, optional): Shard the tfrecord datasets, used for
             multiprocessing datasets. Defaults to None.
         pool (multiprocessing.Pool): Shared multiprocessing pool. Useful
             if ``from_wsi=True``, for sharing a unified processing pool between
             dataloaders. Defaults to None.
+        prefetch_device (str, optional): Prefetch batches onto this device
+            (e.g. ``'/gpu:0'``), overlapping the host-to-device copy with
+            the preceding step. Defaults to None (prefetch on host).
         prob_weights (dict, optional): Dict mapping tfrecords to probability of
             including in batch. Defaults to None.
+        read_buffer_size (int, optional): Number of bytes to buffer when
+            reading each TFRecord. Larger buffers reduce read stalls when
+            TFRecords are on network or cloud storage. Defaults to None
+            (Tensorflow default, 256 KB).
         rois (list(str), optional): List of ROI paths. Only used if
             from_wsi=True.  Defaults to None.
         roi_method (str, optional): Method for extracting ROIs. Only used if
@@ -536,6 +609,11 @@ def interleave(
     """
     if not len(paths):
         raise errors.TFRecordsNotFoundError
+    if num_parallel_reads == 'auto':
+        num_parallel_reads = tf.data.AUTOTUNE
+    elif isinstance(num_parallel_reads, str):
+        raise ValueError("num_parallel_reads must be an int or 'auto', "
+                         f"got {num_parallel_reads!r}")
     _path_type = "slides" if from_wsi else "tfrecords"
     log.debug(
         f'Interleaving {len(paths)} {_path_type}: infinite={infinite}, '
@@ -543,6 +621,9 @@ def interleave(
     if from_wsi and not tile_um:
         raise ValueError("`tile_um` required for interleave() "
                          "if `from_wsi=True`")
+    if cache and infinite:
+        raise ValueError("Caching is not supported for infinite datasets "
+                         "(`infinite=True`)")
 
     if num_shards:
         log.debug(f'num_shards={num_shards}, shard_idx={shard_idx}')
@@ -626,7 +707,16 @@ def interleave(
         else:
             base_parser = tfrecord_parser
 
+        # Finite, unweighted tfrecord datasets (e.g. for evaluation) are read
+        # with a single parallel interleave rather than one dataset per file.
+        # Deterministic datasets keep the original per-file sampling order.
+        parallel_interleave = not (
+            from_wsi or infinite or prob_weights or deterministic
+        )
         for t, tfr in enumerate(paths):
+            if parallel_interleave:
+                pb.advance(interleave_task)
+                continue
             if from_wsi:
                 tf_dts = otsu_list[t].tensorflow(
                     pool=pool,
@@ -639,6 +729,7 @@ def interleave(
             else:
                 tf_dts = tf.data.TFRecordDataset(
                     tfr,
+                    buffer_size=read_buffer_size,
                     num_parallel_reads=num_parallel_reads
                 )
             if num_shards:
@@ -655,10 +746,42 @@ def interleave(
             pb.advance(interleave_task)
 
         # ------- Interleave and parse datasets -------------------------------
-        sampled_dataset = tf.data.Dataset.sample_from_datasets(
-            datasets,
-            weights=weights
-        )
+        if parallel_interleave:
+            if clip:
+                take = np.array([clip[tfr] // (num_shards if num_shards else 1)
+                                 for tfr in paths], dtype=np.int64)
+            else:
+                take = np.full(len(paths), -1, dtype=np.int64)
+
+            def read_tfrecord(tfr, n):
+                tf_dts = tf.data.TFRecordDataset(
+                    tfr,
+                    buffer_size=read_buffer_size
+                )
+                if num_shards:
+                    tf_dts = tf_dts.shard(num_shards, index=shard_idx)
+                return tf_dts.take(n)
+
+            # Limit the number of tfrecords open at once, to stay well
+            # below the file descriptor limit on large datasets.
+            if isinstance(num_parallel_reads, int) and num_parallel_reads > 0:
+                cycle_length = min(len(paths), num_parallel_reads)
+            else:
+                cycle_length = min(len(paths), _MAX_INTERLEAVE_CYCLE)
+            sampled_dataset = tf.data.Dataset.from_tensor_slices(
+                (paths, take)
+            ).interleave(
+                read_tfrecord,
+                cycle_length=cycle_length,
+                block_length=1,
+                num_parallel_calls=num_parallel_reads,
+                deterministic=deterministic
+            )
+        else:
+            sampled_dataset = tf.data.Dataset.sample_from_datasets(
+                datasets,
+                weights=weights
+            )
         dataset = _get_parsed_datasets(
             sampled_dataset,
             base_parser=base_parser,  # type: ignore
@@ -667,39 +790,79 @@ def interleave(
             include_loc=incl_loc,
             deterministic=deterministic
         )
+        # ------- Cache decoded images ----------------------------------------
+        # Stain augmentation is random, so cache before normalization if used.
+        stain_augment = isinstance(augment, str) and 'n' in augment
+        cache_path = '' if cache is True else cache
+        if cache and (stain_augment or not normalizer):
+            dataset = dataset.cache(cache_path)
         # ------- Apply normalization -----------------------------------------
         if normalizer:
             if normalizer.vectorized:
                 log.debug("Using vectorized normalization")
                 norm_batch_size = 32 if not batch_size else batch_size
-                dataset = dataset.batch(norm_batch_size, drop_remainder=drop_last)
+                dataset = dataset.batch(
+                    norm_batch_size,
+                    drop_remainder=drop_last,
+                    num_parallel_calls=tf.data.AUTOTUNE,
+                    deterministic=deterministic
+                )
             else:
                 log.debug("Using per-image normalization")
             dataset = dataset.map(
-                partial(normalizer.tf_to_tf, augment=(isinstance(augment, str)
-                                                      and 'n' in augment)),
+                partial(normalizer.tf_to_tf, augment=stain_augment),
                 num_parallel_calls=tf.data.AUTOTUNE,
                 deterministic=deterministic,
             )
             if normalizer.vectorized:
                 dataset = dataset.unbatch()
+            if cache and not stain_augment:
+                dataset = dataset.cache(cache_path)
 
         # ------- Standardize and augment images ------------------------------
+        # If all augmentations support batched input, batch before mapping
+        # so standardization and augmentation run once per batch.
+        vectorize = bool(batch_size) and _is_batch_safe(augment, transform)
+        if vectorize:
+            log.debug("Using vectorized standardization/augmentation")
+            dataset = dataset.batch(
+                batch_size,
+                drop_remainder=drop_last,
+                num_parallel_calls=tf.data.AUTOTUNE,
+                deterministic=deterministic
+            )
+        options = tf.data.Options()
+        options.experimental_optimization.map_parallelization = True
+        options.experimental_optimization.parallel_batch = True
+        dataset = dataset.with_options(options)
+        _process_image = partial(
+            process_image,
+            standardize=standardize,
+            augment=augment,
+            transform=transform,
+            size=img_size
+        )
         dataset = dataset.map(
-            partial(
-                process_image,
-                standardize=standardize,
-                augment=augment,
-                transform=transform,
-                size=img_size
-            ),
+            _process_image,
             num_parallel_calls=tf.data.AUTOTUNE,
             deterministic=deterministic
         )
         # ------- Batch and prefetch ------------------------------------------
-        if batch_size:
-            dataset = dataset.batch(batch_size, drop_remainder=drop_last)
+        if batch_size and not vectorize:
+            dataset = dataset.batch(
+                batch_size,
+                drop_remainder=drop_last,
+                num_parallel_calls=tf.data.AUTOTUNE,
+                deterministic=deterministic
+            )
         dataset = dataset.prefetch(tf.data.AUTOTUNE)
+        if prefetch_device:
+            # Only prefetching is supported after copying to a device, so
+            # all processing above runs on the host.
+            log.debug(f"Prefetching batches to device {prefetch_device}")
+            dataset = dataset.apply(
+                tf.data.experimental.prefetch_to_device(prefetch_device)
+            )
         if from_wsi:
             dataset.est_num_tiles = est_num_tiles
         return dataset
@@ -847,8 +1010,7 @@ def join_tfrecord(
     writer = tf.io.TFRecordWriter(output_file)
     tfrecord_files = glob(join(input_folder, "*.tfrecords"))
     datasets = []
-    if assign_slide:
-        slide = assign_slide.encode('utf-8')
+    slide = assign_slide.encode('utf-8') if assign_slide else None
     features, img_type = detect_tfrecord_format(tfrecord_files[0])
     parser = get_tfrecord_parser(
         tfrecord_files[0],
@@ -861,20 +1023,17 @@ def join_tfrecord(
             raise errors.TFRecordsError(
                 "Mismatching tfrecord format found, unable to merge"
             )
-        dataset = tf.data.TFRecordDataset(tfrecord)
-        dataset = dataset.shuffle(1000)
-        dataset_iter = iter(dataset)
-        datasets += [dataset_iter]
-    while len(datasets):
-        index = randint(0, len(datasets)-1)
-        try:
-            record = next(datasets[index])
-        except StopIteration:
-            del(datasets[index])
-            continue
+        datasets += [tf.data.TFRecordDataset(tfrecord)]
+
+    # Sample randomly between tfrecords, then shuffle with a single
+    # bounded buffer of raw records.
+    dataset = tf.data.Dataset.sample_from_datasets(datasets)
+    dataset = dataset.shuffle(1000)
+    for record in dataset:
         writer.write(
             read_and_return_record(record, parser, slide)  # type: ignore
         )
+    writer.close()
 
 
 def split_tfrecord(tfrecord_file: str, output_folder: str) -> None:
@@ -980,18 +1139,20 @@ def transform_tfrecord(
     writer = tf.io.TFRecordWriter(target)
     parser = get_tfrecord_parser(
         origin,
-        ('slide', 'image_raw', 'loc_x', 'loc_y'),
-        decode_images=(hue_shift is not None or resize is not None),
+        ('slide', 'loc_x', 'loc_y'),
         error_if_invalid=False,
         to_numpy=True
     )
+    image_description = {'image_raw': FEATURE_DESCRIPTION['image_raw']}
 
-    def process_image(image_string):
+    def process_image(record):
+        image_string = tf.io.parse_single_example(
+            record, image_description
+        )['image_raw']
         if hue_shift:
             decoded_image = tf.image.decode_png(image_string, channels=3)
             adjusted_image = tf.image.adjust_hue(decoded_image, hue_shift)
-            encoded_image = tf.io.encode_jpeg(adjusted_image, quality=80)
-            return encoded_image.numpy()
+            image_string = tf.io.encode_jpeg(adjusted_image, quality=80)
         elif resize:
             decoded_image = tf.image.decode_png(image_string, channels=3)
             resized_image = tf.image.resize(
@@ -999,20 +1160,24 @@ def transform_tfrecord(
                 (resize, resize),
                 method=tf.image.ResizeMethod.NEAREST_NEIGHBOR
             )
-            encoded_image = tf.io.encode_jpeg(resized_image, quality=80)
-            return encoded_image.numpy()
-        else:
-            return image_string
+            image_string = tf.io.encode_jpeg(resized_image, quality=80)
+        return record, image_string
 
-    for record in dataset:
-        slide, image_raw, loc_x, loc_y = parser(record)  # type: ignore
+    # Decode, transform, and re-encode images in parallel, in order.
+    dataset = dataset.map(
+        process_image,
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=True
+    )
+    for record, image_processed_data in dataset:
+        slide, loc_x, loc_y = parser(record)  # type: ignore
         if assign_slide and isinstance(assign_slide, str):
             slidename = bytes(assign_slide, 'utf-8')
         elif assign_slide:
             slidename = bytes(assign_slide(slide), 'utf-8')
         else:
             slidename = slide
-        image_processed_data = process_image(image_raw)
+        image_processed_data = image_processed_data.numpy()
         tf_example = tfrecord_example(
             slidename,
             image_processed_data,
@@ -110,6 +110,10 @@ class TrainerConfigFastAI(_TrainerConfig):
         fit_one_cycle: bool = True,
         epochs: int = 32,
         batch_size: int = 64,
+        compile: Union[bool, str] = False,
+        compile_dynamic: bool = True,
+        mixed_precision: bool = False,
+        tf32: bool = False,
         **kwargs
     ):
         r"""Training configuration for FastAI MIL models.
@@ -139,6 +143,25 @@ class TrainerConfigFastAI(_TrainerConfig):
                 learning rate schedule. Defaults to True.
             epochs (int): Maximum number of epochs. Defaults to 32.
             batch_size (int): Batch size. Defaults to 64.
+            compile (bool, str): Compile the model forward pass with
+                ``torch.compile()``, fusing elementwise operations (e.g. the
+                encoder activation) into the preceding kernels. May also be
+                a ``torch.compile()`` mode, such as ``'max-autotune'``.
+                Requires PyTorch >= 2.0; building a learner raises a
+                ValueError if ``torch.compile()`` is unavailable. Defaults to
+                False.
+            compile_dynamic (bool): Compile with dynamic shapes, so that bag
+                lengths varying between batches do not trigger recompilation.
+                If False, the model is specialized to static input shapes,
+                which is only recommended if every batch has the same bag
+                length. Defaults to True.
+            mixed_precision (bool): Train with automatic mixed precision
+                (float16 autocast with loss scaling), running the linear
+                layers on tensor cores. Defaults to False.
+            tf32 (bool): Allow float32 matrix multiplications and convolutions
+                to use TF32 tensor cores, and enable cuDNN autotuning, while
+                training. Global PyTorch settings are restored after
+                training. Defaults to False.
             **kwargs: All additional keyword arguments are passed to either
                 :class:`slideflow.mil.ModelConfigCLAM` for CLAM models, or
                 :class:`slideflow.mil.ModelConfigFastAI` for all other models.
@@ -151,6 +174,10 @@ class TrainerConfigFastAI(_TrainerConfig):
         self.fit_one_cycle = fit_one_cycle
         self.epochs = epochs
         self.batch_size = batch_size
+        self.compile = compile
+        self.compile_dynamic = compile_dynamic
+        self.mixed_precision = mixed_precision
+        self.tf32 = tf32
         if model in ModelConfigCLAM.valid_models:
             self.model_config = ModelConfigCLAM(model=model, **kwargs)
         else:
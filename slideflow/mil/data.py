@@ -61,6 +61,19 @@ def build_multibag_dataset(bags, targets, encoder, bag_size, n_bags, use_lens=Fa
     dataset.encoder = encoder
     return dataset
 
+def trim_padded_bags(samples):
+    """Trim the zero-padding of a batch of bags to its longest bag.
+
+    Bags are padded to ``bag_size`` individually. When every bag in a batch is
+    smaller than ``bag_size``, the trailing padded instances are masked out by
+    the model anyway, so they are dropped before collation to avoid spending
+    encoder and attention compute on them. Expects samples of the form
+    ``(features, lengths, targets)``, as built by ``build_dataset`` with
+    ``use_lens=True``.
+    """
+    n_max = max(int(sample[1]) for sample in samples)
+    return [(sample[0][:n_max], *sample[1:]) for sample in samples]
+
 # -----------------------------------------------------------------------------
 
 def _to_fixed_size_bag(
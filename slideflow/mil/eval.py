@@ -74,7 +74,7 @@ def eval_mil(
 
     """
     # Load model and configuration.
-    model, config = utils.load_model_weights(weights, config)
+    model, config = utils.load_model_weights(weights, config, fuse=True)
 
     # Generate predictions.
     df, y_att = predict_from_model(
@@ -163,7 +163,7 @@ def eval_multimodal_mil(
     n_out = len(unique)
 
     # Load model
-    model, config = utils.load_model_weights(weights, config)
+    model, config = utils.load_model_weights(weights, config, fuse=True)
 
     # Inference.
     y_pred, y_att = _predict_multimodal_mil(
@@ -281,7 +281,7 @@ def predict_slide(
         normalizer = detected_normalizer
 
     # Load model
-    model_fn, config = utils.load_model_weights(model, config)
+    model_fn, config = utils.load_model_weights(model, config, fuse=True)
     mil_params = sf.util.load_json(join(model, "mil_params.json"))
     if "bags_extractor" not in mil_params:
         raise ValueError(
@@ -610,7 +610,7 @@ def _predict_mil(
         loaded = torch.unsqueeze(loaded, dim=0)
         with torch.no_grad():
             if use_lens:
-                lens = torch.from_numpy(np.array([loaded.shape[1]])).to(device)
+                lens = torch.tensor([loaded.shape[1]], device=device)
                 model_args = (loaded, lens)
             else:
                 model_args = (loaded,)
@@ -667,7 +667,7 @@ def _predict_multimodal_mil(
         with torch.no_grad():
             if use_lens:
                 model_args = [
-                    (mag_bag, torch.from_numpy(np.array([mag_bag.shape[1]])).to(device))
+                    (mag_bag, torch.tensor([mag_bag.shape[1]], device=device))
                     for mag_bag in loaded
                 ]
             else:
@@ -1,9 +1,15 @@
 import torch
+import torch.nn.functional as F
+from packaging import version
 from torch import nn
 from typing import Optional, List
 
 from slideflow.model.torch_utils import get_device
 
+# Tensor.scatter_reduce(..., reduce='amax') is available from PyTorch 1.12.
+# Earlier versions either lack it or expose an incompatible prototype.
+_HAS_SEGMENT_REDUCE = version.parse(torch.__version__) >= version.parse("1.12")
+
 # -----------------------------------------------------------------------------
 
 class Attention_MIL(nn.Module):
@@ -29,11 +35,22 @@ class Attention_MIL(nn.Module):
             encoder:  A network transforming bag instances into feature vectors.
         """
         super().__init__()
+        # The default encoder and attention act on each instance separately,
+        # so they can be run on packed (unpadded) or flattened instances.
+        self._flat_encoder = encoder is None
+        self._flat_attention = attention is None
+        self._packable = self._flat_encoder and self._flat_attention
         self.encoder = encoder or nn.Sequential(nn.Linear(n_feats, z_dim), nn.ReLU())
         self.attention = attention or Attention(z_dim)
-        self.head = head or nn.Sequential(
-            nn.Flatten(), nn.BatchNorm1d(z_dim), nn.Dropout(dropout_p), nn.Linear(z_dim, n_out)
-        )
+        if head is None:
+            # Weighted embedding sums are already B x Z, so no Flatten is needed.
+            head = nn.Sequential(
+                nn.BatchNorm1d(z_dim), nn.Dropout(dropout_p), nn.Linear(z_dim, n_out)
+            )
+            self._register_load_state_dict_pre_hook(_shift_legacy_head_keys)
+        self.head = head
+        # Lazily-grown [0, ..., N_max-1] row used to build the padding mask.
+        self.register_buffer('_idx', None, persistent=False)
 
     def forward(self, bags, lens):
         # bags: B x N_max x F
@@ -41,19 +58,72 @@ class Attention_MIL(nn.Module):
         assert bags.ndim == 3
         assert bags.shape[0] == lens.shape[0]
 
-        embeddings = self.encoder(bags) # -> B x N_max x Z
+        if self._packable and bags.shape[0] > 1 and _HAS_SEGMENT_REDUCE:
+            weighted_embedding_sums = self._packed_weighted_sums(bags, lens)  # -> B x Z
+        else:
+            embeddings = self._encode(bags) # -> B x N_max x Z
 
-        masked_attention_scores = self._masked_attention_scores(embeddings, lens)   # -> B x N_max x 1
-        weighted_embedding_sums = (masked_attention_scores * embeddings).sum(-2)    # -> B x Z
+            masked_attention_scores = self._masked_attention_scores(embeddings, lens)   # -> B x N_max x 1
+            weighted_embedding_sums = torch.bmm(
+                masked_attention_scores.transpose(1, 2), embeddings
+            ).squeeze(1)    # -> B x Z
 
         scores = self.head(weighted_embedding_sums) # -> B x C
 
         return scores
 
     def calculate_attention(self, bags, lens):
-        embeddings = self.encoder(bags)
+        embeddings = self._encode(bags)
         return self._masked_attention_scores(embeddings, lens)
 
+    def _encode(self, bags):
+        """Encode all bag instances, as a single 2D GEMM when possible."""
+        if self._flat_encoder:
+            return _per_instance(self.encoder, bags)
+        return self.encoder(bags)
+
+    def _packed_weighted_sums(self, bags, lens):
+        """Calculates attention-weighted embedding sums on unpadded instances.
+
+        Valid instances of all bags are packed into a single S x F tensor
+        (S = sum(lens)), so the encoder, attention and softmax never touch
+        padding. The softmax is computed per bag with segment reductions.
+        Requires PyTorch 1.12+.
+
+        Packing needs the total number of instances on the host, so this
+        performs a single device-to-host sync; the packing indices are then
+        built on the device.
+        """
+        bs, bag_size, n_feats = bags.shape
+        lens = lens.reshape(bs).long()
+        total = int(lens.sum())
+        segments = torch.repeat_interleave(
+            torch.arange(bs, device=bags.device), lens, output_size=total
+        )                                                               # -> S
+        offsets = torch.cumsum(lens, 0) - lens
+        positions = torch.arange(total, device=bags.device) - offsets[segments]
+        packed = bags.reshape(bs * bag_size, n_feats).index_select(
+            0, segments * bag_size + positions
+        )                                                               # -> S x F
+
+        embeddings = self.encoder(packed)                               # -> S x Z
+        attention_scores = self.attention(embeddings).squeeze(-1)       # -> S
+
+        # Segment softmax: subtract the per-bag max, exponentiate, normalize.
+        # The shift does not change the softmax, so no gradient flows
+        # through the max.
+        detached_scores = attention_scores.detach()
+        seg_max = detached_scores.new_full((bs,), -torch.inf).scatter_reduce(
+            0, segments, detached_scores, reduce='amax'
+        )
+        weights = torch.exp(attention_scores - seg_max[segments])
+        denom = weights.new_zeros(bs).index_add(0, segments, weights)
+        weights = weights / denom[segments]
+
+        return embeddings.new_zeros(bs, embeddings.shape[-1]).index_add(
+            0, segments, weights.unsqueeze(-1) * embeddings
+        )
+
     def _masked_attention_scores(self, embeddings, lens):
         """Calculates attention scores for all bags.
         Returns:
@@ -62,19 +132,49 @@ class Attention_MIL(nn.Module):
              *  0 otherwise
         """
         # embeddings: B x N_max x Z
-        bs, bag_size = embeddings.shape[0], embeddings.shape[1]
-        attention_scores = self.attention(embeddings)   # -> B x N_max x 1
-
-        # a tensor containing a row [0, ..., bag_size-1] for each batch instance
-        idx = torch.arange(bag_size).repeat(bs, 1).to(attention_scores.device)
-
-        # False for every instance of bag i with index(instance) >= lens[i]
-        attention_mask = (idx < lens.unsqueeze(-1)).unsqueeze(-1)
-
-        masked_attention = torch.where(
-            attention_mask, attention_scores, torch.full_like(attention_scores, -torch.inf)
-        )
-        return torch.softmax(masked_attention, dim=1)   # -> B x N_max x 1
+        if self._flat_attention:
+            attention_scores = _per_instance(self.attention, embeddings)
+        else:
+            attention_scores = self.attention(embeddings)   # -> B x N_max x 1
+        idx = _cached_arange(self, embeddings.shape[1], embeddings.device)
+        # The built-in attention ends in a Linear layer, which does not save
+        # its output for backward, so its scores can be masked in place.
+        return masked_softmax(
+            attention_scores, lens, idx, inplace=self._flat_attention
+        )  # -> B x N_max x 1
+
+    def fuse_for_inference(self):
+        """Fold the head's BatchNorm into its final Linear layer.
+
+        In eval mode the default head (BatchNorm -> Dropout -> Linear) is an
+        affine map followed by a Linear layer, so the normalization can be
+        absorbed into the Linear weights and bias, saving a kernel per forward
+        pass. The model must be in eval mode, and should not be trained
+        afterwards. Custom heads are left unchanged.
+        """
+        if self.training:
+            raise RuntimeError("fuse_for_inference() requires the model to "
+                               "be in eval mode; call .eval() first.")
+        head = self.head
+        if not (isinstance(head, nn.Sequential)
+                and len(head) == 3
+                and isinstance(head[0], nn.BatchNorm1d)
+                and isinstance(head[2], nn.Linear)
+                and head[0].track_running_stats):
+            return self
+        bn, linear = head[0], head[2]
+        with torch.no_grad():
+            scale = torch.rsqrt(bn.running_var + bn.eps)
+            if bn.affine:
+                scale = scale * bn.weight
+            shift = -bn.running_mean * scale
+            if bn.affine:
+                shift = shift + bn.bias
+            fused = nn.Linear(linear.in_features, linear.out_features).to(linear.weight)
+            fused.weight.copy_(linear.weight * scale)
+            fused.bias.copy_(linear.bias + linear.weight @ shift)
+        self.head = nn.Sequential(nn.Identity(), head[1], fused).eval()
+        return self
 
     def relocate(self):
         """Move model to GPU. Required for FastAI compatibility."""
@@ -85,6 +185,81 @@ class Attention_MIL(nn.Module):
 
 # -----------------------------------------------------------------------------
 
+def _shift_legacy_head_keys(state_dict, prefix, *args):
+    """Shift default head layer indices saved before the leading Flatten
+    was removed (``head.1`` -> ``head.0``, ``head.3`` -> ``head.2``)."""
+    for old, new in (('head.1.', 'head.0.'), ('head.3.', 'head.2.')):
+        for key in list(state_dict.keys()):
+            if key.startswith(prefix + old):
+                state_dict[prefix + new + key[len(prefix + old):]] = state_dict.pop(key)
+
+
+def _per_instance(module, x):
+    """Apply an instance-wise network (encoder or attention) as 2D GEMMs.
+
+    Flattening B x N_max x F to a contiguous (B * N_max) x F matrix gives
+    cuBLAS one large matrix product instead of a batched one with a small M
+    dimension or a strided input layout.
+    """
+    bs, bag_size, n_feats = x.shape
+    out = module(x.reshape(bs * bag_size, n_feats).contiguous())
+    return out.reshape(bs, bag_size, -1)   # -> B x N_max x Z
+
+
+def _cached_arange(module, n, device):
+    """Return ``[0, ..., n-1]`` from a buffer cached on the module.
+
+    The buffer is only reallocated when a larger bag is seen or the model
+    has moved to a different device, so the common forward pass performs
+    no allocation or host-to-device copy to build the padding mask.
+    """
+    idx = module._idx
+    if idx is None or idx.numel() < n or idx.device != device:
+        idx = torch.arange(n, device=device)
+        module._idx = idx
+    return idx[:n]
+
+
+def masked_softmax(attention_scores, lens, idx=None, attention_mask=None,
+                   inplace=False):
+    """Softmax over the instance dimension, ignoring padded instances.
+
+    The mask is built by broadcasting a single ``[0, ..., N_max-1]`` row
+    against ``lens``, so masking and normalization are expressed as one
+    elementwise pattern followed by the softmax, without materializing a
+    B x N_max index tensor or a separate ``-inf`` fill tensor.
+
+    With ``inplace=True``, ``attention_scores`` is masked in place, saving
+    an allocation. It must then be the fresh output of a layer that does not
+    save its output for backward (e.g. Linear, but not Tanh or Sigmoid).
+
+    Args:
+        attention_scores (torch.Tensor): Unnormalized scores, B x N_max x 1.
+        lens (torch.Tensor): Number of valid instances in each bag, B or B x 1.
+        idx (torch.Tensor, optional): Precomputed ``[0, ..., N_max-1]`` row.
+            If None, it is created on the device of ``attention_scores``.
+        attention_mask (torch.Tensor, optional): Precomputed B x N_max boolean
+            mask, True for valid instances. If provided, ``lens`` and ``idx``
+            are not used.
+        inplace (bool): Mask ``attention_scores`` in place. Defaults to False.
+
+    Returns:
+        torch.Tensor: Attention weights, B x N_max x 1. Weights of padded
+        instances are 0.
+    """
+    if attention_mask is None:
+        if idx is None:
+            idx = torch.arange(attention_scores.shape[1], device=attention_scores.device)
+        # False for every instance of bag i with index(instance) >= lens[i]
+        attention_mask = idx < lens.reshape(-1, 1)
+    if inplace:
+        attention_scores = attention_scores.masked_fill_(~attention_mask.unsqueeze(-1), -torch.inf)
+    else:
+        attention_scores = attention_scores.masked_fill(~attention_mask.unsqueeze(-1), -torch.inf)
+    return torch.softmax(attention_scores, dim=1)
+
+# -----------------------------------------------------------------------------
+
 def Attention(n_in: int, n_latent: Optional[int] = None) -> nn.Module:
     """A network calculating an embedding's importance weight."""
     # Note: softmax not being applied here, as it will be applied later,
@@ -101,6 +276,29 @@ def Attention(n_in: int, n_latent: Optional[int] = None) -> nn.Module:
 
 # -----------------------------------------------------------------------------
 
+def _rename_legacy_multimodal_keys(state_dict, prefix, *args):
+    """Map weights saved with per-magnification attributes (``encoder_0``,
+    ``attention_0``, ``prehead_0``, ...) onto the module lists, and shift
+    prehead layer indices saved before the leading Flatten was removed."""
+    legacy = {'encoder_': 'encoders.', 'attention_': 'attentions.', 'prehead_': 'preheads.'}
+    for key in list(state_dict.keys()):
+        if not key.startswith(prefix):
+            continue
+        name = key[len(prefix):]
+        for old, new in legacy.items():
+            if name.startswith(old) and name[len(old):].split('.')[0].isdigit():
+                name = new + name[len(old):]
+                break
+        parts = name.split('.')
+        if parts[0] == 'preheads' and len(parts) > 3 and parts[2] == '1':
+            # Legacy prehead: Flatten, BatchNorm1d, ReLU, Dropout
+            parts[2] = '0'
+            name = '.'.join(parts)
+        if prefix + name != key:
+            state_dict[prefix + name] = state_dict.pop(key)
+
+# -----------------------------------------------------------------------------
+
 class MultiModal_Attention_MIL(nn.Module):
     """Attention-based MIL model for multiple input feature spaces.
 
@@ -123,13 +321,20 @@ class MultiModal_Attention_MIL(nn.Module):
         self._z_dim = z_dim
         self._dropout_p = dropout_p
         self._n_out = n_out
-        for i in range(self.n_input):
-            setattr(self, f'encoder_{i}', nn.Sequential(nn.Linear(n_feats[i], z_dim), nn.ReLU()))
-            setattr(self, f'attention_{i}', Attention(z_dim, n_latent=0))  # Simple, single-layer attention
-            setattr(self, f'prehead_{i}', nn.Sequential(nn.Flatten(),
-                                                        nn.BatchNorm1d(z_dim),
-                                                        nn.ReLU(),
-                                                        nn.Dropout(dropout_p)))
+        self.encoders = nn.ModuleList([
+            nn.Sequential(nn.Linear(n_feats[i], z_dim), nn.ReLU())
+            for i in range(self.n_input)
+        ])
+        self.attentions = nn.ModuleList([
+            Attention(z_dim, n_latent=0)  # Simple, single-layer attention
+            for _ in range(self.n_input)
+        ])
+        self.preheads = nn.ModuleList([
+            nn.Sequential(nn.BatchNorm1d(z_dim),
+                          nn.ReLU(),
+                          nn.Dropout(dropout_p))
+            for _ in range(self.n_input)
+        ])
 
         # Concatenate the weighted sums of embeddings from each magnification
         # into a single vector, then pass it through a linear layer.
@@ -140,6 +345,9 @@ class MultiModal_Attention_MIL(nn.Module):
             nn.Dropout(0.1),
             nn.Linear(z_dim, n_out)
         )
+        # Lazily-grown [0, ..., N_max-1] row used to build the padding mask.
+        self.register_buffer('_idx', None, persistent=False)
+        self._register_load_state_dict_pre_hook(_rename_legacy_multimodal_keys)
 
     def forward(self, *bags_and_lens):
         """Return predictions using all bags and magnifications.
@@ -154,7 +362,6 @@ class MultiModal_Attention_MIL(nn.Module):
 
         embeddings = self._calculate_embeddings(bags)
         masked_attention_scores = self._all_masked_attention(embeddings, lenses)
-
         weighted_embeddings = self._calculate_weighted_embeddings(masked_attention_scores, embeddings)
         merged_embeddings = torch.cat(weighted_embeddings, dim=1)
 
@@ -195,25 +402,54 @@ class MultiModal_Attention_MIL(nn.Module):
 
     def _calculate_weighted_embeddings(self, masked_attention_scores, embeddings):
         return [
-            getattr(self, f'prehead_{i}')(torch.sum(mas * emb, dim=1))
-            for i, (mas, emb) in enumerate(zip(masked_attention_scores, embeddings))
+            prehead(torch.bmm(mas.transpose(1, 2), emb).squeeze(1))
+            for prehead, mas, emb in zip(self.preheads, masked_attention_scores, embeddings)
         ]
 
     def _calculate_embeddings(self, bags):
-        """Calculate embeddings for all magnifications."""
-        return [
-            getattr(self, f'encoder_{i}')(bags[i])
-            for i in range(self.n_input)
-        ]
+        """Calculate embeddings for all magnifications.
+
+        When all bags share the same shape, the per-magnification encoders
+        are evaluated together as a single batched matmul.
+        """
+        if self.n_input > 1 and all(b.shape == bags[0].shape for b in bags[1:]):
+            return self._calculate_grouped_embeddings(bags)
+        return [_per_instance(encoder, bag) for encoder, bag in zip(self.encoders, bags)]
+
+    def _calculate_grouped_embeddings(self, bags):
+        """Run all encoders (Linear + ReLU) as one batched matmul."""
+        linears = [encoder[0] for encoder in self.encoders]
+        bs, bag_size, n_feats = bags[0].shape
+        x = torch.stack(bags).view(self.n_input, bs * bag_size, n_feats)
+        weight = torch.stack([linear.weight for linear in linears]).transpose(1, 2)
+        bias = torch.stack([linear.bias for linear in linears]).unsqueeze(1)
+        z = torch.relu(torch.baddbmm(bias, x, weight))
+        return list(z.view(self.n_input, bs, bag_size, -1).unbind(0))
+
+    def _padding_masks(self, embeddings, lenses):
+        """Build the B x N_max padding mask for each magnification level.
+
+        Masks are built once per distinct (bag size, lens tensor) pair, and
+        shared by all magnifications that use the same lens tensor.
+        """
+        masks, cache = [], {}
+        for emb, lens in zip(embeddings, lenses):
+            key = (emb.shape[1], id(lens))
+            if key not in cache:
+                idx = _cached_arange(self, emb.shape[1], emb.device)
+                cache[key] = idx < lens.reshape(-1, 1)
+            masks.append(cache[key])
+        return masks
 
     def _all_masked_attention(self, embeddings, lenses):
         """Calculate masked attention scores for all magnification levels."""
+        masks = self._padding_masks(embeddings, lenses)
         return [
-            self._masked_attention_scores(embeddings[i], lenses[i], i)
+            self._masked_attention_scores(embeddings[i], lenses[i], i, masks[i])
             for i in range(self.n_input)
         ]
 
-    def _masked_attention_scores(self, embeddings, lens, mag_index):
+    def _masked_attention_scores(self, embeddings, lens, mag_index, attention_mask=None):
         """Calculate masked attention scores at the given magnification.
 
         Returns:
@@ -221,17 +457,13 @@ class MultiModal_Attention_MIL(nn.Module):
              *  The attention score of instance i of bag j if i < len[j]
              *  0 otherwise
         """
-        bs, bag_size = embeddings.shape[0], embeddings.shape[1]
-        attention_scores = getattr(self, f'attention_{mag_index}')(embeddings)
-
-        # a tensor containing a row [0, ..., bag_size-1] for each batch instance
-        idx = torch.arange(bag_size).repeat(bs, 1).to(attention_scores.device)
-
-        # False for every instance of bag i with index(instance) >= lens[i]
-        attention_mask = (idx < lens.unsqueeze(-1)).unsqueeze(-1)
-
-        masked_attention = torch.where(attention_mask, attention_scores, -torch.inf)
-        return torch.softmax(masked_attention, dim=1)
+        attention_scores = _per_instance(self.attentions[mag_index], embeddings)
+        if attention_mask is not None:
+            return masked_softmax(
+                attention_scores, lens, attention_mask=attention_mask, inplace=True
+            )
+        idx = _cached_arange(self, embeddings.shape[1], embeddings.device)
+        return masked_softmax(attention_scores, lens, idx, inplace=True)
 
     # --- FastAI compatibility -------------------------------------------------
 
@@ -284,44 +516,55 @@ class UQ_MultiModal_Attention_MIL(MultiModal_Attention_MIL):
         mode_uncertainty = self._calculate_mode_uncertainty(expanded_embeddings)
 
         # Weight the embeddings from each magnification by their uncertainty.
-        stacked_uncertainty = torch.stack(mode_uncertainty, dim=1)
-        uncertainty_weights = 1 - torch.softmax(stacked_uncertainty, dim=1)
+        uncertainty_weights = 1 - torch.softmax(mode_uncertainty, dim=1)
 
-        final_weighted_embeddings = self._merge_weighted_embeddings(
+        return self._merge_weighted_embeddings(
             masked_attention_scores, embeddings, uncertainty_weights
         )
-        return torch.sum(final_weighted_embeddings, dim=1)
 
     def _calculate_mode_uncertainty(self, expanded_embeddings):
-        mode_uncertainty = []
-        for i in range(self.n_input):
-            # Enforce dropout.
-            _prior_status = self.training
-            self.uq_dropout.train()
-            dropout_expanded = self.uq_dropout(expanded_embeddings[i])
-            self.train(_prior_status)
+        """Estimate the uncertainty contributed by each magnification.
 
-            # Concatenate the expanded embedding sums with the original
-            # embedding sums.
-            all_embeddings = [
-                    (expanded_embeddings[j] if j!=i else dropout_expanded) * 0.5
-                    for j in range(self.n_input)
-                ]
-            all_embeddings = torch.sum(torch.stack(all_embeddings, dim=2), dim=2)
+        For each magnification i, dropout is applied to its expanded embedding
+        sums, which are averaged with the unperturbed sums of all other
+        magnifications and passed through the head. All magnifications are
+        evaluated in a single head call.
 
-            # Pass the concatenated embeddings through a final linear layer.
-            expanded_scores = self.head(all_embeddings)
+        Returns:
+            torch.Tensor: Uncertainty for each bag and magnification,
+            B x n_input.
+        """
+        stacked = torch.stack(expanded_embeddings, dim=0)  # -> n_input x B x 30 x Z
+
+        # Enforce dropout, for all magnifications at once.
+        dropout_expanded = F.dropout(stacked, p=self.uq_dropout.p, training=True)
 
-            # Average the scores across the 30 dropout samples.
-            score_stds = torch.std(expanded_scores, dim=1)
-            avg_by_batch = score_stds.mean(axis=1)
+        # Averaging the perturbed magnification with all others is the
+        # unperturbed average plus the (halved) dropout perturbation.
+        base = torch.sum(stacked, dim=0, keepdim=True) * 0.5
+        all_embeddings = base + (dropout_expanded - stacked) * 0.5
 
-            mode_uncertainty.append(avg_by_batch)
+        # Pass the perturbed embeddings through the final layers.
+        expanded_scores = self.head(all_embeddings)
 
-        return mode_uncertainty
+        # Average the scores across the 30 dropout samples.
+        score_stds = torch.std(expanded_scores, dim=2)
+        avg_by_batch = score_stds.mean(dim=-1)  # -> n_input x B
+
+        return avg_by_batch.t()
 
     def _merge_weighted_embeddings(self, masked_attention_scores, embeddings, uncertainty_weights):
-        return torch.stack([
-            getattr(self, f'prehead_{i}')(torch.sum(mas * emb, dim=1)) * uncertainty_weights[:, i].unsqueeze(-1)
-            for i, (mas, emb) in enumerate(zip(masked_attention_scores, embeddings))
-        ], dim=1)
+        """Sum the uncertainty-weighted embeddings of all magnifications.
+
+        The weighted embeddings are accumulated into a single B x Z tensor
+        rather than stacked into a B x n_input x Z tensor and then summed.
+        """
+        merged = None
+        for i, (prehead, mas, emb) in enumerate(zip(self.preheads, masked_attention_scores, embeddings)):
+            weighted = prehead(torch.bmm(mas.transpose(1, 2), emb).squeeze(1))
+            weight = uncertainty_weights[:, i].unsqueeze(-1)
+            if merged is None:
+                merged = weighted * weight
+            else:
+                merged.addcmul_(weighted, weight)
+        return merged
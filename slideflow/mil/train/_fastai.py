@@ -1,7 +1,8 @@
+import os
 import torch
-import pandas as pd
 import numpy as np
 import numpy.typing as npt
+from contextlib import contextmanager
 from typing import List, Optional, Union, Tuple
 from torch import nn
 from sklearn.preprocessing import OneHotEncoder
@@ -34,22 +35,109 @@ def train(learner, config, callbacks=None):
     ]
     if callbacks:
         cbs += callbacks
-    if config.fit_one_cycle:
-        if config.lr is None:
-            lr = learner.lr_find().valley
-            log.info(f"Using auto-detected learning rate: {lr}")
+    with _tensor_cores(getattr(config, 'tf32', False)):
+        if config.fit_one_cycle:
+            if config.lr is None:
+                lr = learner.lr_find().valley
+                log.info(f"Using auto-detected learning rate: {lr}")
+            else:
+                lr = config.lr
+            learner.fit_one_cycle(n_epoch=config.epochs, lr_max=lr, cbs=cbs)
         else:
-            lr = config.lr
-        learner.fit_one_cycle(n_epoch=config.epochs, lr_max=lr, cbs=cbs)
+            if config.lr is None:
+                lr = learner.lr_find().valley
+                log.info(f"Using auto-detected learning rate: {lr}")
+            else:
+                lr = config.lr
+            learner.fit(n_epoch=config.epochs, lr=lr, wd=config.wd, cbs=cbs)
+    return learner
+
+def _compile_model(
+    model: nn.Module,
+    mode: Union[bool, str] = True,
+    dynamic: bool = True
+) -> nn.Module:
+    """Compile the forward pass of a model with ``torch.compile()``.
+
+    Only the bound ``forward`` is replaced, so parameter names and saved
+    weights are unaffected. If ``mode`` is a string, it is passed to
+    ``torch.compile()``. Training batches are trimmed to their longest bag,
+    so bag length varies between batches; ``dynamic=True`` avoids
+    recompiling for each new length, while ``dynamic=False`` specializes
+    the model to static shapes.
+    """
+    if not hasattr(torch, 'compile'):
+        raise ValueError(
+            "compile=True requires torch.compile(), available in PyTorch "
+            f">= 2.0 (installed: {torch.__version__}). Set compile=False."
+        )
+    if isinstance(mode, str):
+        log.debug("Compiling model forward pass with "
+                  f"torch.compile(mode={mode!r}, dynamic={dynamic})")
+        model.forward = torch.compile(model.forward, mode=mode, dynamic=dynamic)
     else:
-        if config.lr is None:
-            lr = learner.lr_find().valley
-            log.info(f"Using auto-detected learning rate: {lr}")
+        log.debug("Compiling model forward pass with "
+                  f"torch.compile(dynamic={dynamic})")
+        model.forward = torch.compile(model.forward, dynamic=dynamic)
+    return model
+
+@contextmanager
+def _tensor_cores(enabled: bool = True):
+    """Allow float32 matmuls and convolutions to run on tensor cores (TF32).
+
+    The previous global PyTorch settings are restored on exit, so TF32 only
+    applies to work done inside the context.
+    """
+    if not enabled:
+        yield
+        return
+    has_precision = hasattr(torch, 'get_float32_matmul_precision')
+    if has_precision:
+        prev_precision = torch.get_float32_matmul_precision()
+    prev_matmul = torch.backends.cuda.matmul.allow_tf32
+    prev_cudnn = torch.backends.cudnn.allow_tf32
+    prev_benchmark = torch.backends.cudnn.benchmark
+    try:
+        if has_precision:
+            torch.set_float32_matmul_precision('high')
         else:
-            lr = config.lr
-        learner.fit(n_epoch=config.epochs, lr=lr, wd=config.wd, cbs=cbs)
+            torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.backends.cudnn.benchmark = True
+        yield
+    finally:
+        if has_precision:
+            torch.set_float32_matmul_precision(prev_precision)
+        torch.backends.cuda.matmul.allow_tf32 = prev_matmul
+        torch.backends.cudnn.allow_tf32 = prev_cudnn
+        torch.backends.cudnn.benchmark = prev_benchmark
+
+
+def _configure_precision(learner: Learner, config: TrainerConfigFastAI) -> Learner:
+    """Enable mixed-precision training on the learner, if configured."""
+    if getattr(config, 'mixed_precision', False):
+        log.debug("Training with mixed precision (float16)")
+        learner = learner.to_fp16()
     return learner
 
+
+def _class_weights(targets: npt.NDArray, categories: npt.NDArray) -> npt.NDArray:
+    """Normalized inverse-frequency weight for each category (float32)."""
+    counts = (targets.reshape(-1, 1) == categories.reshape(1, -1)).sum(axis=0)
+    if not counts.all():
+        missing = ', '.join(map(str, categories[counts == 0]))
+        raise ValueError(
+            f"No training samples found for categories: {missing}. "
+            "Unable to calculate class weights."
+        )
+    weight = counts.sum() / counts
+    return (weight / weight.sum()).astype(np.float32)
+
+
+def _num_train_workers() -> int:
+    """Number of DataLoader workers used to load training bags."""
+    return min(8, os.cpu_count() or 1)
+
 # -----------------------------------------------------------------------------
 
 def build_learner(config, *args, **kwargs) -> Tuple[Learner, Tuple[int, int]]:
@@ -137,7 +225,9 @@ def _build_clam_learner(
         train_dataset,
         batch_size=1,
         shuffle=True,
-        num_workers=1,
+        num_workers=_num_train_workers(),
+        pin_memory=True,
+        persistent_workers=True,
         drop_last=False,
         device=device,
         **dl_kwargs
@@ -180,6 +270,7 @@ def _build_clam_learner(
     # Create learning and fit.
     dls = DataLoaders(train_dl, val_dl)
     learner = Learner(dls, model, loss_func=loss_func, metrics=[loss_utils.RocAuc()], path=outdir)
+    learner = _configure_precision(learner, config)
 
     return learner, (n_features, n_classes)
 
@@ -237,14 +328,21 @@ def _build_fastai_learner(
         use_lens=config.model_config.use_lens
     )
     # -> return (features, targets.squeeze())
+    train_dl_kwargs = dict(dl_kwargs)
+    if config.model_config.use_lens:
+        # Models using bag lengths mask padded instances, so padding beyond
+        # the longest bag in each batch can be skipped entirely.
+        train_dl_kwargs.setdefault('before_batch', data_utils.trim_padded_bags)
     train_dl = DataLoader(
         train_dataset,
         batch_size=config.batch_size,
         shuffle=True,
-        num_workers=1,
+        num_workers=_num_train_workers(),
+        pin_memory=True,
+        persistent_workers=True,
         drop_last=False,
         device=device,
-        **dl_kwargs
+        **train_dl_kwargs
     )
     val_dataset = data_utils.build_dataset(
         bags[val_idx],
@@ -271,19 +369,23 @@ def _build_fastai_learner(
     model = config.model_fn(n_in, n_out).to(device)
     if hasattr(model, 'relocate'):
         model.relocate()
+    if getattr(config, 'compile', False):
+        model = _compile_model(
+            model,
+            config.compile,
+            dynamic=getattr(config, 'compile_dynamic', True)
+        )
 
     # Loss should weigh inversely to class occurences.
-    counts = pd.value_counts(targets[train_idx])
-    weight = counts.sum() / counts
-    weight /= weight.sum()
-    weight = torch.tensor(
-        list(map(weight.get, encoder.categories_[0])), dtype=torch.float32
+    weight = torch.from_numpy(
+        _class_weights(targets[train_idx], encoder.categories_[0])
     ).to(device)
     loss_func = nn.CrossEntropyLoss(weight=weight)
 
     # Create learning and fit.
     dls = DataLoaders(train_dl, val_dl)
     learner = Learner(dls, model, loss_func=loss_func, metrics=[RocAuc()], path=outdir)
+    learner = _configure_precision(learner, config)
 
     return learner, (n_in, n_out)
 
@@ -383,18 +485,22 @@ def _build_multimodal_learner(
     model = config.model_fn(n_in, n_out).to(device)
     if hasattr(model, 'relocate'):
         model.relocate()
+    if getattr(config, 'compile', False):
+        model = _compile_model(
+            model,
+            config.compile,
+            dynamic=getattr(config, 'compile_dynamic', True)
+        )
 
     # Loss should weigh inversely to class occurences.
-    counts = pd.value_counts(targets[train_idx])
-    weight = counts.sum() / counts
-    weight /= weight.sum()
-    weight = torch.tensor(
-        list(map(weight.get, encoder.categories_[0])), dtype=torch.float32
+    weight = torch.from_numpy(
+        _class_weights(targets[train_idx], encoder.categories_[0])
     ).to(device)
     loss_func = nn.CrossEntropyLoss(weight=weight)
 
     # Create learning and fit.
     dls = DataLoaders(train_dl, val_dl)
     learner = Learner(dls, model, loss_func=loss_func, metrics=[RocAuc()], path=outdir)
+    learner = _configure_precision(learner, config)
 
     return learner, (n_in, n_out)
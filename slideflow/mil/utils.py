@@ -25,6 +25,7 @@ def load_model_weights(
     *,
     input_shape: Optional[int] = None,
     output_shape: Optional[int] = None,
+    fuse: bool = False,
 ) -> Tuple["torch.nn.Module", _TrainerConfig]:
     """Load weights and build model.
 
@@ -38,6 +39,9 @@ def load_model_weights(
     Keyword Args:
         input_shape (int): Number of features in the input data.
         output_shape (int): Number of output classes.
+        fuse (bool): Fuse layers for faster inference, for models which
+            support it (see ``fuse_for_inference()``). The fused model
+            should not be trained further. Defaults to False.
 
     Returns:
         :class:`torch.nn.Module`: Loaded model.
@@ -118,6 +122,8 @@ def load_model_weights(
     if hasattr(model, 'relocate'):
         model.relocate()  # type: ignore
     model.eval()
+    if fuse and hasattr(model, 'fuse_for_inference'):
+        model.fuse_for_inference()  # type: ignore
     return model, config
 
 
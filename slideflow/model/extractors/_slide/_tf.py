@@ -14,11 +14,10 @@ if TYPE_CHECKING:
 
 # -----------------------------------------------------------------------------
 
-@tf.function
-def _standardize(image, loc, preprocess=None):
-    """Standardize an image."""
-    parsed_image = tf.image.per_image_standardization(image)
-    return parsed_image, loc
+@tf.function(jit_compile=True)
+def _standardize_batch(images):
+    """Standardize a batch of uint8 images, fused with XLA."""
+    return tf.image.per_image_standardization(images)
 
 def _wrap_preprocess(preprocess):
 
@@ -109,17 +108,18 @@ def _build_slide_iterator(
                 # decomposition is unsuccessful.
                 tile_dataset = tile_dataset.apply(tf.data.experimental.ignore_errors())
 
-        # Standardize the images:
-        tile_dataset = tile_dataset.map(
-            (_standardize if preprocess_fn is None
-                          else _wrap_preprocess(preprocess_fn)),
-            num_parallel_calls=tf.data.AUTOTUNE,
-            deterministic=True
-        )
+        # Apply custom preprocessing. Default standardization is deferred
+        # until the uint8 batch reaches the accelerator.
+        if preprocess_fn is not None:
+            tile_dataset = tile_dataset.map(
+                _wrap_preprocess(preprocess_fn),
+                num_parallel_calls=tf.data.AUTOTUNE,
+                deterministic=True
+            )
 
         # Batch and prefetch
         tile_dataset = tile_dataset.batch(batch_size, drop_remainder=False)
-        tile_dataset = tile_dataset.prefetch(8)
+        tile_dataset = tile_dataset.prefetch(tf.data.AUTOTUNE)
 
     return tile_dataset
 
@@ -176,6 +176,8 @@ def features_from_slide_tf(
 
     # Extract features from the tiles
     for i, (batch_images, batch_loc) in enumerate(tile_dataset):
+        if preprocess_fn is None:
+            batch_images = _standardize_batch(batch_images)
         model_out = extractor._predict(batch_images)
         if not isinstance(model_out, (list, tuple)):
             model_out = [model_out]
@@ -190,18 +192,16 @@ def features_from_slide_tf(
                 _act_batch.append(m.numpy())
         _act_batch = np.concatenate(_act_batch, axis=-1)
 
+        # Write the batch into the grid with a single vectorized
+        # assignment, casting to the grid dtype once per batch.
         _loc_batch = batch_loc.numpy()
-        grid_idx_updated = []
-        for i, act in enumerate(_act_batch):
-            xi = _loc_batch[i][0]
-            yi = _loc_batch[i][1]
-            if callback:
-                grid_idx_updated.append((yi, xi))
-            features_grid[yi][xi] = act
+        xi = _loc_batch[:, 0]
+        yi = _loc_batch[:, 1]
+        features_grid[yi, xi] = _act_batch
 
         # Trigger a callback signifying that the grid has been updated.
         # Useful for progress tracking.
         if callback:
-            callback(grid_idx_updated)
+            callback(list(zip(yi, xi)))
 
     return features_grid
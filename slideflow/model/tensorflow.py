@@ -1138,7 +1138,7 @@ class Trainer:
         self._allow_tf32 = allow_tf32
         self.name = name
         self.neptune_run = None
-        self.annotations_tables = []
+        self._label_tensor = None
         self.eval_callback = _PredictionAndEvaluationCallback  # type: tf.keras.callbacks.Callback
         self.load_method = load_method
         self.custom_objects = custom_objects
@@ -1165,18 +1165,22 @@ class Trainer:
                                     f'number of outcomes {num_outcomes}')
         self.outcome_names = outcome_names
         self._setup_inputs()
+        if labels or self.num_slide_features:
+            self._build_slide_index_table()
         if labels:
             self.num_classes = self.hp._detect_classes_from_labels(labels)
+            # The final row holds the default label (-1) for unknown slides.
+            default_labels = np.full(
+                (1, outcome_labels.shape[1]), -1, dtype=outcome_labels.dtype
+            )
             with tf.device('/cpu'):
-                for oi in range(outcome_labels.shape[1]):
-                    self.annotations_tables += [tf.lookup.StaticHashTable(
-                        tf.lookup.KeyValueTensorInitializer(
-                            self.slides,
-                            outcome_labels[:, oi]
-                        ), -1
-                    )]
+                self._label_tensor = tf.constant(
+                    np.concatenate([outcome_labels, default_labels])
+                )
         else:
             self.num_classes = None  # type: ignore
+        if self.num_slide_features:
+            self._build_slide_input_table()
 
         # Normalization setup
         self.normalizer = self.hp.get_normalizer()
@@ -1228,6 +1232,12 @@ class Trainer:
             except KeyError:
                 raise errors.ModelError("Unable to find slide-level input at "
                                         "'input' key in annotations")
+            missing = [s for s in self.slides if s not in self.slide_input]
+            if missing:
+                raise errors.ModelError(
+                    f'Slide-level input not found for {len(missing)} slides: '
+                    + ', '.join(missing)
+                )
             for slide in self.slides:
                 if len(self.slide_input[slide]) != self.num_slide_features:
                     num_in_feature_table = len(self.slide_input[slide])
@@ -1237,6 +1247,49 @@ class Trainer:
                         f'got {num_in_feature_table}'
                     )
 
+    def _build_slide_index_table(self) -> None:
+        """Build an in-graph lookup mapping slide names to row indices of
+        the label and slide input tensors. Unknown slides map to the row
+        following the last slide."""
+        with tf.device('/cpu'):
+            self._slide_index_table = tf.lookup.StaticHashTable(
+                tf.lookup.KeyValueTensorInitializer(
+                    self.slides,
+                    np.arange(len(self.slides), dtype=np.int64)
+                ), len(self.slides)
+            )
+
+    def _build_slide_input_table(self) -> None:
+        """Precompute slide-level input as a constant float32 tensor, with
+        rows indexed by the slide index table. The final row holds zeros
+        for unknown slides."""
+        assert self.slide_input is not None
+        slide_input = np.array(
+            [self.slide_input[s] for s in self.slides],
+            dtype=np.float32
+        ).reshape(len(self.slides), self.num_slide_features)
+        default_input = np.zeros(
+            (1, self.num_slide_features), dtype=np.float32
+        )
+        with tf.device('/cpu'):
+            self._slide_input_tensor = tf.constant(
+                np.concatenate([slide_input, default_input])
+            )
+
+    def _lookup_labels(self, slide: tf.Tensor) -> tf.Tensor:
+        """Return the outcome labels for a slide, one per outcome."""
+        return tf.gather(
+            self._label_tensor,
+            self._slide_index_table.lookup(slide)
+        )
+
+    def _lookup_slide_input(self, slide: tf.Tensor) -> tf.Tensor:
+        """Return the slide-level input features for a slide."""
+        return tf.gather(
+            self._slide_input_tensor,
+            self._slide_index_table.lookup(slide)
+        )
+
     def _compile_model(self) -> None:
         """Compile keras model."""
         self.model.compile(
@@ -1274,26 +1327,18 @@ class Trainer:
         if self.num_classes is None:
             label = None
         elif len(self.num_classes) > 1:  # type: ignore
+            labels = self._lookup_labels(slide)
             label = {
-                f'out-{oi}': self.annotations_tables[oi].lookup(slide)
+                f'out-{oi}': labels[oi]
                 for oi in range(len(self.num_classes))  # type: ignore
             }
         else:
-            label = self.annotations_tables[0].lookup(slide)
+            label = self._lookup_labels(slide)[0]
 
         # Add additional non-image feature inputs if indicated,
         #     excluding the event feature used for CPH models
         if self.num_slide_features:
-
-            def slide_lookup(s):
-                return self.slide_input[s.numpy().decode('utf-8')]
-
-            num_features = self.num_slide_features
-            slide_feature_input_val = tf.py_function(
-                func=slide_lookup,
-                inp=[slide],
-                Tout=[tf.float32] * num_features
-            )
+            slide_feature_input_val = self._lookup_slide_input(slide)
             image_dict.update({'slide_feature_input': slide_feature_input_val})
 
         return image_dict, label
@@ -1971,24 +2016,16 @@ class LinearTrainer(Trainer):
         if self.num_classes is None:
             label = None
         else:
+            labels = self._lookup_labels(slide)
             label = [
-                self.annotations_tables[oi].lookup(slide)
+                labels[oi]
                 for oi in range(self.num_classes)  # type: ignore
             ]
 
         # Add additional non-image feature inputs if indicated,
         #     excluding the event feature used for CPH models
         if self.num_slide_features:
-
-            def slide_lookup(s):
-                return self.slide_input[s.numpy().decode('utf-8')]
-
-            num_features = self.num_slide_features
-            slide_feature_input_val = tf.py_function(
-                func=slide_lookup,
-                inp=[slide],
-                Tout=[tf.float32] * num_features
-            )
+            slide_feature_input_val = self._lookup_slide_input(slide)
             image_dict.update({'slide_feature_input': slide_feature_input_val})
 
         return image_dict, label
@@ -2063,8 +2100,9 @@ class CPHTrainer(LinearTrainer):
         if self.num_classes is None:
             label = None
         else:
+            labels = self._lookup_labels(slide)
             label = [
-                self.annotations_tables[oi].lookup(slide)
+                labels[oi]
                 for oi in range(self.num_classes)  # type: ignore
             ]
 
@@ -2072,30 +2110,13 @@ class CPHTrainer(LinearTrainer):
         #     excluding the event feature used for CPH models
         if self.num_slide_features:
             # Time-to-event data must be added as a separate feature
-
-            def slide_lookup(s):
-                return self.slide_input[s.numpy().decode('utf-8')][1:]
-
-            def event_lookup(s):
-                return self.slide_input[s.numpy().decode('utf-8')][0]
-
-            num_features = self.num_slide_features - 1
-            event_input_val = tf.py_function(
-                func=event_lookup,
-                inp=[slide],
-                Tout=[tf.float32]
-            )
-            image_dict.update({'event_input': event_input_val})
-            slide_feature_input_val = tf.py_function(
-                func=slide_lookup,
-                inp=[slide],
-                Tout=[tf.float32] * num_features
-            )
+            slide_input_val = self._lookup_slide_input(slide)
+            image_dict.update({'event_input': slide_input_val[:1]})
             # Add slide input features, excluding the event feature
             # used for CPH models
             if not (self.num_slide_features == 1):
                 image_dict.update(
-                    {'slide_feature_input': slide_feature_input_val}
+                    {'slide_feature_input': slide_input_val[1:]}
                 )
         return image_dict, label
 
@@ -2,6 +2,7 @@
 
 import os
 import tempfile
+import weakref
 from typing import (TYPE_CHECKING, Any, Dict, List, Tuple, Union, Optional,
                     Callable)
 
@@ -17,6 +18,9 @@ import tensorflow as tf
 if TYPE_CHECKING:
     import neptune.new as neptune
 
+# Traced evaluation functions, cached per model and loss function.
+_EVAL_FNS = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary
+
 # -----------------------------------------------------------------------------
 
 def log_summary(
@@ -293,6 +297,53 @@ def flatten(
     return tf.keras.models.Model(inputs=inputs, outputs=outputs)
 
 
+def _build_eval_fns(
+    model_ref: "weakref.ref",
+    loss: Optional[Callable]
+) -> Tuple[Callable, Callable, Callable]:
+    """Build the prediction and loss functions used by eval_from_model()."""
+
+    @tf.function
+    def get_predictions(img, training=False):
+        return model_ref()(img, training=training)
+
+    def get_batch_loss(yt, yp):
+        """Sum of finite losses for a batch."""
+        if isinstance(yt, dict):
+            loss_val = [loss(yt[f'out-{o}'], yp[o]) for o in range(len(yt))]
+            return tf.math.add_n([
+                tf.math.reduce_sum(tf.boolean_mask(l, tf.math.is_finite(l)))
+                for l in loss_val
+            ])
+        loss_val = loss(yt, yp)
+        if loss_val.shape.rank:
+            # Loss is a vector
+            is_finite = tf.math.is_finite(loss_val)
+            return tf.math.reduce_sum(tf.boolean_mask(loss_val, is_finite))
+        else:
+            # Loss is a scalar
+            return loss_val
+
+    @tf.function
+    def get_predictions_and_loss(img, yt):
+        yp = model_ref()(img, training=False)
+        return yp, get_batch_loss(yt, yp)
+
+    return get_predictions, get_batch_loss, get_predictions_and_loss
+
+
+def _get_eval_fns(
+    model: "tf.keras.Model",
+    loss: Optional[Callable]
+) -> Tuple[Callable, Callable, Callable]:
+    """Return evaluation functions for a model and loss, reusing previously
+    traced functions so repeated validation does not retrace the model."""
+    model_fns = _EVAL_FNS.setdefault(model, {})
+    if loss not in model_fns:
+        model_fns[loss] = _build_eval_fns(weakref.ref(model), loss)
+    return model_fns[loss]
+
+
 def eval_from_model(
     model: "tf.keras.Model",
     dataset: "tf.data.Dataset",
@@ -339,9 +390,9 @@ def eval_from_model(
     if verbosity not in ('silent', 'quiet', 'full'):
         raise ValueError(f"Invalid value '{verbosity}' for argument 'verbosity'")
 
-    @tf.function
-    def get_predictions(img, training=False):
-        return model(img, training=training)
+    get_predictions, get_batch_loss, get_predictions_and_loss = _get_eval_fns(
+        model, loss
+    )
 
     y_true, y_pred, tile_to_slides, locations, y_std = [], [], [], [], []
     num_vals, num_batches, num_outcomes, running_loss = 0, 0, 0, 0
@@ -392,7 +443,7 @@ def eval_from_model(
                     log.warning("TFrecord location information not found.")
                     loc_missing = True
                 elif not loc_missing:
-                    locations += [tf.stack([loc_x, loc_y], axis=-1).numpy()]  # type: ignore
+                    locations += [np.stack([loc_x.numpy(), loc_y.numpy()], axis=-1)]
             else:
                 img, yt, slide = batch
 
@@ -406,33 +457,23 @@ def eval_from_model(
                 yp, yp_std, num_outcomes = get_uq_predictions(
                     img, get_predictions, num_outcomes, uq_n
                 )
-                y_pred += [yp]
                 y_std += [yp_std]  # type: ignore
-            else:
+            elif predict_only or loss is None:
                 yp = get_predictions(img, training=False)
-                y_pred += [yp]
+            else:
+                # Predictions and loss are computed in a single graph call.
+                yp, batch_loss = get_predictions_and_loss(img, yt)
+            y_pred += [yp]
 
             if not predict_only:
                 if isinstance(yt, dict):
                     y_true += [[yt[f'out-{o}'].numpy() for o in range(len(yt))]]
-                    yt = [yt[f'out-{o}'] for o in range(len(yt))]
-                    if loss is not None:
-                        loss_val = [loss(yt[i], yp[i]) for i in range(len(yt))]
-                        loss_val = [tf.boolean_mask(l, tf.math.is_finite(l)) for l in loss_val]
-                        batch_loss = tf.math.reduce_sum(loss_val).numpy()
-                        running_loss = (((num_vals - slide.shape[0]) * running_loss) + batch_loss) / num_vals
                 else:
                     y_true += [yt.numpy()]
-                    if loss is not None:
-                        loss_val = loss(yt, yp)
-                        if tf.rank(loss_val):
-                            # Loss is a vector
-                            is_finite = tf.math.is_finite(loss_val)
-                            batch_loss = tf.math.reduce_sum(tf.boolean_mask(loss_val, is_finite)).numpy()
-                        else:
-                            # Loss is a scalar
-                            batch_loss = loss_val.numpy()  # type: ignore
-                        running_loss = (((num_vals - slide.shape[0]) * running_loss) + batch_loss) / num_vals
+                if loss is not None:
+                    if uq:
+                        batch_loss = get_batch_loss(yt, yp)
+                    running_loss = (((num_vals - slide.shape[0]) * running_loss) + batch_loss.numpy()) / num_vals
     except KeyboardInterrupt:
         if pb is not None:
             pb.stop()
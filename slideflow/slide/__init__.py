@@ -456,7 +456,9 @@ class _BaseLoader:
         *,
         finetune_depth: Optional[Sequence[float]] = None,
         normalizer: Optional[str] = 'reinhard_mask',
-        allow_errors: bool = False
+        allow_errors: bool = False,
+        cache: bool = False,
+        phase_correlation: bool = False
     ) -> Tuple[Tuple[int, int], float]:
         """Align this slide to another slide.
 
@@ -477,6 +479,11 @@ class _BaseLoader:
                 Defaults to 'reinhard_mask'.
             allow_errors (bool): Whether to allow and ignore alignment errors
                 when finetuning at higher magnification. Defaults to False.
+            cache (bool): Cache alignment preprocessing and results by image
+                content. Defaults to False.
+            phase_correlation (bool): Seed ECC alignment with an FFT phase
+                correlation estimate, which recovers larger offsets. Offsets
+                may differ slightly from ECC alone. Defaults to False.
 
         Returns:
             Tuple of (x, y) offset and MSE of initial alignment.
@@ -564,7 +571,8 @@ class _BaseLoader:
         # Align thumbnails and adjust for scale.
         try:
             alignment_raw, mse = align_by_translation(
-                their_thumb, our_thumb, round=True, calculate_mse=True
+                their_thumb, our_thumb, round=True, calculate_mse=True,
+                cache=cache, phase_correlation=phase_correlation
             )
         except errors.AlignmentError:
             raise errors.AlignmentError("Alignment failed at thumbnail (mpp=8)")
@@ -629,7 +637,7 @@ class _BaseLoader:
                 their_region = norm.transform(their_region[:, :, 0:3])
 
             try:
-                rough_alignment = sf.slide.utils._find_translation_matrix(their_region, our_region, h=50, search_window=53)
+                rough_alignment = sf.slide.utils._find_translation_matrix(their_region, our_region, h=50, search_window=53, cache=cache, phase_correlation=phase_correlation)
             except cv2.error:
                 rough_alignment = None
                 log.debug("Initial rough alignment failed at mpp={}".format(finetune_mpp))
@@ -638,7 +646,7 @@ class _BaseLoader:
 
             # Finetune alignment on this region.
             try:
-                alignment_fine = align_by_translation(their_region, our_region, round=True, warp_matrix=rough_alignment)
+                alignment_fine = align_by_translation(their_region, our_region, round=True, warp_matrix=rough_alignment, cache=cache, phase_correlation=phase_correlation)
             except errors.AlignmentError:
                 msg = "Alignment failed at finetuning (mpp={})".format(finetune_mpp)
                 if allow_errors:
@@ -2118,13 +2126,16 @@ class WSI(_BaseLoader):
             log.debug("Preparing whole-slide context for normalizer")
             normalizer.set_context(self)
 
+        # Worker arguments are pickled with every task sent to a process
+        # pool, so only include what the tile workers read. The tile grid is
+        # filtered in this process, and ROIs are only needed for drawing
+        # or YOLO labels.
         w_args = SimpleNamespace(**{
             'full_extract_px': self.full_extract_px,
             'mpp_override': self._mpp_override,
             'reader_kwargs': self._reader_kwargs,
             'roi_scale': self.roi_scale,
-            'rois': self.rois,
-            'grid': self.grid,
+            'rois': self.rois if (yolo or draw_roi) else [],
             'downsample_level': self.downsample_level,
             'filter_downsample_level': filter_lev,
             'filter_downsample_ratio': filter_downsample_ratio,
@@ -2255,19 +2266,32 @@ class WSI(_BaseLoader):
                         chunksize=csize
                     )
 
+            # Shared progress bar updates are flushed at ~10 Hz, rather than
+            # taking the progress bar lock once per tile.
+            pending = 0
+            last_flush = time.monotonic()
             with sf.util.cleanup_progress(pbar):
-                for e, result in enumerate(i_mapped):
-                    if show_progress:
-                        pbar.advance(task, 1)
-                    elif self.pb is not None:
-                        self.pb.advance(0)
-                    if result is None:
-                        continue
-                    else:
-                        yield result
-                        n_extracted += 1
-                        if max_tiles and n_extracted >= max_tiles:
-                            break
+                try:
+                    for e, result in enumerate(i_mapped):
+                        if show_progress:
+                            pbar.advance(task, 1)
+                        elif self.pb is not None:
+                            pending += 1
+                            now = time.monotonic()
+                            if now - last_flush >= 0.1:
+                                self.pb.advance(0, pending)
+                                pending = 0
+                                last_flush = now
+                        if result is None:
+                            continue
+                        else:
+                            yield result
+                            n_extracted += 1
+                            if max_tiles and n_extracted >= max_tiles:
+                                break
+                finally:
+                    if pending:
+                        self.pb.advance(0, pending)
 
             if should_close:
                 pool.close()
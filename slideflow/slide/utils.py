@@ -1,15 +1,20 @@
 """Utility functions and constants for slide reading."""
 
 import csv
+import hashlib
 import io
+import os
+import sys
+import threading
 import numpy as np
-import shapely.geometry as sg
 import xml.etree.ElementTree as ET
 
 from PIL import Image, ImageDraw
 from slideflow import errors
 from types import SimpleNamespace
-from typing import Union, List, Tuple, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Union, List, Tuple, Optional, Callable
 
 # Constants
 DEFAULT_JPG_MPP = 1
@@ -35,16 +40,36 @@ ROTATE_270_CLOCKWISE = 3
 FLIP_HORIZONTAL = 4
 FLIP_VERTICAL = 5
 
+# Opt-in caches for alignment (see ``cache`` in _find_translation_matrix),
+# keyed by image content.
+_ALIGNMENT_CACHE_LOCK = threading.Lock()
+_ALIGNMENT_PREP_CACHE = OrderedDict()  # type: OrderedDict
+_ALIGNMENT_PREP_CACHE_BYTES = 256 * 1024 * 1024
+_WARP_MATRIX_CACHE = OrderedDict()  # type: OrderedDict
+_WARP_MATRIX_CACHE_SIZE = 256
+
+
+# Precomputed OpenSlide level property keys.
+_OPS_LEVEL_HEIGHT_KEYS = [f'openslide.level[{i}].height' for i in range(32)]
+_OPS_LEVEL_WIDTH_KEYS = [f'openslide.level[{i}].width' for i in range(32)]
+_OPS_LEVEL_DOWNSAMPLE_KEYS = [f'openslide.level[{i}].downsample' for i in range(32)]
+
 
 def OPS_LEVEL_HEIGHT(level: int) -> str:
+    if 0 <= level < 32:
+        return _OPS_LEVEL_HEIGHT_KEYS[level]
     return f'openslide.level[{level}].height'
 
 
 def OPS_LEVEL_WIDTH(level: int) -> str:
+    if 0 <= level < 32:
+        return _OPS_LEVEL_WIDTH_KEYS[level]
     return f'openslide.level[{level}].width'
 
 
 def OPS_LEVEL_DOWNSAMPLE(level: int) -> str:
+    if 0 <= level < 32:
+        return _OPS_LEVEL_DOWNSAMPLE_KEYS[level]
     return f'openslide.level[{level}].downsample'
 
 
@@ -63,16 +88,17 @@ def draw_roi(
     Returns:
         np.ndarray: Image as numpy array.
     """
-    annPolys = [sg.Polygon(b) for b in coords]
     if isinstance(img, np.ndarray):
         annotated_img = Image.fromarray(img)
     elif isinstance(img, str):
         annotated_img = Image.open(io.BytesIO(img))  # type: ignore
     draw = ImageDraw.Draw(annotated_img)
-    for poly in annPolys:
-        x, y = poly.exterior.coords.xy
-        zipped = list(zip(x.tolist(), y.tolist()))
-        draw.line(zipped, joint='curve', fill=color, width=linewidth)
+    for poly in coords:
+        # Draw the closed exterior ring directly from the vertices.
+        points = [(float(x), float(y)) for x, y in poly]
+        if points and points[0] != points[-1]:
+            points.append(points[0])
+        draw.line(points, joint='curve', fill=color, width=linewidth)
     return np.asarray(annotated_img)
 
 
@@ -86,50 +112,64 @@ def roi_coords_from_image(
     # Scale ROI according to image resizing
     resize_scale = (args.tile_px / args.extract_px)
 
-    def proc_ann(ann):
-        # Scale to full image size
-        coord = ann.coordinates
-        # Offset coordinates to extraction window
-        coord = np.add(coord, np.array([-1 * c[0], -1 * c[1]]))
-        # Rescale according to downsampling and resizing
-        coord = np.multiply(coord, (extract_scale * resize_scale))
-        return coord
+    # Stack the vertices of all ROIs, so they are transformed and filtered
+    # in a single pass rather than one ROI at a time.
+    if not len(args.rois):
+        return [], [], []
+    roi_coords = [np.asarray(roi.coordinates, dtype=np.float64).reshape(-1, 2)
+                  for roi in args.rois]
+    n_vertices = np.array([len(coord) for coord in roi_coords])
+    roi_ids = np.repeat(np.arange(len(roi_coords)), n_vertices)
+    all_coords = np.concatenate(roi_coords)
+
+    # Offset coordinates to extraction window, and rescale
+    # according to downsampling and resizing
+    all_coords -= np.array([c[0], c[1]])
+    all_coords *= (extract_scale * resize_scale)
 
     # Filter out ROIs not in this tile
-    coords = []
-    ll = np.array([0, 0])
-    ur = np.array([args.tile_px, args.tile_px])
-    for roi in args.rois:
-        coord = proc_ann(roi)
-        idx = np.all(np.logical_and(ll <= coord, coord <= ur), axis=1)
-        coords_in_tile = coord[idx]
-        if len(coords_in_tile) > 3:
-            coords += [coords_in_tile]
-
-    # Convert ROI to bounding box that fits within tile
-    boxes = []
-    yolo_anns = []
-    for coord in coords:
-        max_vals = np.max(coord, axis=0)
-        min_vals = np.min(coord, axis=0)
-        max_x = min(max_vals[0], args.tile_px)
-        max_y = min(max_vals[1], args.tile_px)
-        min_x = max(min_vals[0], 0)
-        min_y = max(0, min_vals[1])
-        width = (max_x - min_x) / args.tile_px
-        height = (max_y - min_y) / args.tile_px
-        x_center = ((max_x + min_x) / 2) / args.tile_px
-        y_center = ((max_y + min_y) / 2) / args.tile_px
-        yolo_anns += [[x_center, y_center, width, height]]
-        boxes += [np.array([
-            [min_x, min_y],
-            [min_x, max_y],
-            [max_x, max_y],
-            [max_x, min_y]
-        ])]
+    in_tile = np.all((all_coords >= 0) & (all_coords <= args.tile_px), axis=1)
+    n_in_tile = np.bincount(roi_ids[in_tile], minlength=len(roi_coords))
+    segments = np.split(all_coords[in_tile], np.cumsum(n_in_tile)[:-1])
+    coords = [seg for seg, n in zip(segments, n_in_tile) if n > 3]
+
+    # Convert ROI to bounding box that fits within tile,
+    # for all ROIs at once.
+    if not coords:
+        return coords, [], []
+    starts = np.cumsum([0] + [len(coord) for coord in coords[:-1]])
+    clipped = np.clip(np.concatenate(coords), 0, args.tile_px)
+    mins = np.minimum.reduceat(clipped, starts, axis=0)
+    maxs = np.maximum.reduceat(clipped, starts, axis=0)
+    sizes = (maxs - mins) / args.tile_px
+    centers = ((maxs + mins) / 2) / args.tile_px
+    yolo_anns = np.column_stack([centers, sizes]).tolist()
+    boxes = list(np.stack([
+        mins,
+        np.column_stack([mins[:, 0], maxs[:, 1]]),
+        maxs,
+        np.column_stack([maxs[:, 0], mins[:, 1]])
+    ], axis=1))
     return coords, boxes, yolo_anns
 
 
+def _xml_region_parser(path: str) -> Tuple:
+    """Return a Region iterator, a Vertex finder, and parser error types.
+
+    Uses lxml (with a compiled XPath) if available, otherwise falls back
+    to the standard library ElementTree parser.
+    """
+    try:
+        from lxml import etree
+    except ImportError:
+        regions = ET.iterparse(path, events=('end',))
+        find_vertices = lambda region: region.findall('.//Vertex')
+        return regions, find_vertices, (ET.ParseError,)
+    regions = etree.iterparse(path, events=('end',), tag='Region')
+    find_vertices = etree.XPath('.//Vertex')
+    return regions, find_vertices, (ET.ParseError, etree.XMLSyntaxError)
+
+
 def xml_to_csv(path: str) -> str:
     """Create a QuPath format CSV ROI file from an ImageScope-format XML.
 
@@ -145,47 +185,193 @@ def xml_to_csv(path: str) -> str:
     Raises:
         slideflow.errors.ROIError: If the XML could not be converted.
     """
-    tree = ET.parse(path)
-    root = tree.getroot()
     new_csv_file = path[:-4] + '.csv'
-    required_attributes = ['.//Region', './/Vertex']
-    if not all(root.findall(a) for a in required_attributes):
-        raise errors.ROIError(
-            f"No ROIs found in the XML file {path}. Check that the XML "
-            "file attributes are named correctly named in ImageScope "
-            "format with 'Region' and 'Vertex' tags."
-        )
-    with open(new_csv_file, 'w', newline='') as csvfile:
-        csvwriter = csv.writer(csvfile)
-        csvwriter.writerow(['ROI_name', 'X_base', 'Y_base'])
-        for region in root.findall('.//Region'):
-            id_tag = region.get('Id')
-            if not id_tag:
-                raise errors.ROIError(
-                    "No ID attribute found for Region. Check xml file and "
-                    "ensure it adheres to ImageScope format."
-                )
-            roi_name = 'ROI_' + str(id_tag)
-            vertices = region.findall('.//Vertex')
-            if not vertices:
-                raise errors.ROIError(
-                    "No Vertex found in ROI. Check xml file and ensure it "
-                    "adheres to ImageScope format."
+    n_regions = 0
+    regions, find_vertices, parse_errors = _xml_region_parser(path)
+    try:
+        with open(new_csv_file, 'w', newline='') as csvfile:
+            csvwriter = csv.writer(csvfile)
+            csvwriter.writerow(['ROI_name', 'X_base', 'Y_base'])
+            # Stream regions as they are parsed, rather than building the
+            # full element tree in memory.
+            for _, region in regions:
+                if region.tag != 'Region':
+                    continue
+                id_tag = region.attrib.get('Id')
+                if not id_tag:
+                    raise errors.ROIError(
+                        "No ID attribute found for Region. Check xml file and "
+                        "ensure it adheres to ImageScope format."
+                    )
+                roi_name = 'ROI_' + str(id_tag)
+                vertices = find_vertices(region)
+                if not vertices:
+                    raise errors.ROIError(
+                        "No Vertex found in ROI. Check xml file and ensure it "
+                        "adheres to ImageScope format."
+                    )
+                csvwriter.writerows(
+                    (roi_name, v.attrib.get('X', ''), v.attrib.get('Y', ''))
+                    for v in vertices
                 )
-            csvwriter.writerows([
-                [roi_name, vertex.get('X'), vertex.get('Y')]
-                for vertex in vertices
-            ])
+                n_regions += 1
+                region.clear()
+        if not n_regions:
+            raise errors.ROIError(
+                f"No ROIs found in the XML file {path}. Check that the XML "
+                "file attributes are named correctly named in ImageScope "
+                "format with 'Region' and 'Vertex' tags."
+            )
+    except (errors.ROIError, *parse_errors):
+        os.remove(new_csv_file)
+        raise
     return new_csv_file
 
 
 def _align_to_matrix(im1: np.ndarray, im2: np.ndarray, warp_matrix: np.ndarray) -> np.ndarray:
-    """Align an image to a warp matrix."""
+    """Align an image to a warp matrix.
+
+    The ECC warp matrix already maps output to input coordinates, so it is
+    applied with ``WARP_INVERSE_MAP``; without the flag, OpenCV would invert
+    the matrix itself before warping.
+    """
     import cv2
     # Use the warpAffine function to apply the transformation
     return cv2.warpAffine(im1, warp_matrix, (im2.shape[1], im2.shape[0]), flags=cv2.INTER_LINEAR + cv2.WARP_INVERSE_MAP)
 
 
+def _cuda_available() -> bool:
+    """Check whether the OpenCV CUDA module has a usable device."""
+    import cv2
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+
+def _array_cache_key(im: np.ndarray) -> Tuple:
+    """Identify an array by its shape, dtype, and a hash of its contents."""
+    im = np.ascontiguousarray(im)
+    digest = hashlib.blake2b(im.data, digest_size=16).digest()
+    return (im.shape, im.dtype.str, digest)
+
+
+def _cached_find_translation_matrix(
+    im1: np.ndarray,
+    im2: np.ndarray,
+    **kwargs
+) -> np.ndarray:
+    """Find a translation matrix, reusing results for the same image pair.
+
+    Only used if ``cache=True``. Results are cached per pair of image
+    contents and search parameters, so repeated alignment of the same
+    images (e.g. when evaluating the MSE of an alignment several times)
+    does not rerun ECC. Searches seeded with an explicit ``warp_matrix``
+    are not cached.
+    """
+    if not kwargs.get('cache') or kwargs.get('warp_matrix') is not None:
+        return _find_translation_matrix(im1, im2, **kwargs)
+    key = (_array_cache_key(im1), _array_cache_key(im2),
+           tuple(sorted(kwargs.items())))
+    with _ALIGNMENT_CACHE_LOCK:
+        if key in _WARP_MATRIX_CACHE:
+            _WARP_MATRIX_CACHE.move_to_end(key)
+            return _WARP_MATRIX_CACHE[key].copy()
+    result = _find_translation_matrix(im1, im2, **kwargs)
+    with _ALIGNMENT_CACHE_LOCK:
+        _WARP_MATRIX_CACHE[key] = result.copy()
+        while len(_WARP_MATRIX_CACHE) > _WARP_MATRIX_CACHE_SIZE:
+            _WARP_MATRIX_CACHE.popitem(last=False)
+    return result
+
+
+def _cached_preprocess_for_alignment(im: np.ndarray, **kwargs) -> np.ndarray:
+    """Preprocess an image for alignment, reusing results for the same image.
+
+    Results are cached per image contents and preprocessing parameters, so
+    aligning many images against one fixed reference only denoises the
+    reference once. The cache holds at most ``_ALIGNMENT_PREP_CACHE_BYTES``
+    of preprocessed images. Cached results are shared and must not be
+    modified.
+    """
+    key = (_array_cache_key(im), tuple(sorted(kwargs.items())))
+    with _ALIGNMENT_CACHE_LOCK:
+        if key in _ALIGNMENT_PREP_CACHE:
+            _ALIGNMENT_PREP_CACHE.move_to_end(key)
+            return _ALIGNMENT_PREP_CACHE[key]
+    result = _preprocess_for_alignment(im, **kwargs)
+    if result.nbytes > _ALIGNMENT_PREP_CACHE_BYTES:
+        return result
+    with _ALIGNMENT_CACHE_LOCK:
+        _ALIGNMENT_PREP_CACHE[key] = result
+        total = sum(v.nbytes for v in _ALIGNMENT_PREP_CACHE.values())
+        while total > _ALIGNMENT_PREP_CACHE_BYTES:
+            _, evicted = _ALIGNMENT_PREP_CACHE.popitem(last=False)
+            total -= evicted.nbytes
+    return result
+
+
+def _preprocess_for_alignment(
+    im: np.ndarray,
+    *,
+    denoise: bool = True,
+    h: float = 30,
+    block_size: int = 7,
+    search_window: int = 21,
+    device: str = 'cpu'
+) -> np.ndarray:
+    """Convert an image to a de-noised, histogram-equalized grayscale image.
+
+    Returns a C-contiguous float32 image, with values in [0, 255].
+
+    Non-local means denoising dominates alignment time on large images. If
+    ``device`` is 'cuda' (or 'auto' for images of at least 512 x 512 pixels,
+    where the upload cost is amortized) and OpenCV was built with CUDA, the
+    grayscale image is processed on the GPU. GPU denoising gives slightly
+    different results than the CPU, so it is only used if requested.
+    """
+    import cv2
+
+    use_gpu = (device == 'cuda'
+               or (device == 'auto' and im.shape[0] * im.shape[1] >= 512 * 512))
+    if use_gpu and _cuda_available():
+        gpu_im = cv2.cuda_GpuMat()
+        gpu_im.upload(np.ascontiguousarray(im))
+        gpu_gray = cv2.cuda.cvtColor(gpu_im, cv2.COLOR_BGR2GRAY)
+        if denoise:
+            gpu_gray = cv2.cuda.fastNlMeansDenoising(
+                gpu_gray, h, search_window=search_window, block_size=block_size
+            )
+        gray = cv2.cuda.equalizeHist(gpu_gray).download()
+    else:
+        gray = cv2.cvtColor(im, cv2.COLOR_BGR2GRAY)
+        if denoise:
+            gray = cv2.fastNlMeansDenoising(gray, None, h, block_size, search_window)
+        gray = cv2.equalizeHist(gray)
+
+    # ECC and phase correlation both operate on float32; convert once here
+    # into a C-contiguous array so neither needs its own conversion.
+    return np.ascontiguousarray(gray, dtype=np.float32)
+
+
+def _phase_correlation_matrix(im1_gray: np.ndarray, im2_gray: np.ndarray) -> np.ndarray:
+    """Estimate the translation warp matrix with FFT phase correlation.
+
+    Returns a 2x3 warp matrix in the same convention as ``findTransformECC``
+    (``im2(x) ~ im1(x + t)``), computed with a single cross-power spectrum
+    rather than iterative refinement. Inputs are float32 grayscale images
+    of the same size.
+    """
+    import cv2
+
+    window = cv2.createHanningWindow((im1_gray.shape[1], im1_gray.shape[0]), cv2.CV_32F)
+    (shift_x, shift_y), _ = cv2.phaseCorrelate(im1_gray, im2_gray, window)
+    warp_matrix = np.eye(2, 3, dtype=np.float32)
+    warp_matrix[0, 2] = -shift_x
+    warp_matrix[1, 2] = -shift_y
+    return warp_matrix
+
+
 def _find_translation_matrix(
     im1: np.ndarray,
     im2: np.ndarray,
@@ -196,37 +382,99 @@ def _find_translation_matrix(
     search_window: int = 21,
     n_iterations: int = 10000,
     termination_eps = 1e-10,
-    warp_matrix: Optional[np.ndarray] = None
+    warp_matrix: Optional[np.ndarray] = None,
+    phase_correlation: bool = False,
+    refine: bool = True,
+    device: str = 'cpu',
+    coarse_first: bool = False,
+    cache: bool = False
 ) -> np.ndarray:
     """
     Align two images using only scaling and translation.
 
+    If ``phase_correlation`` is True and no initial ``warp_matrix`` is
+    given, the translation is first estimated with FFT phase correlation,
+    which is used to seed the (optional) ECC refinement.
+
     :param im1: The image to be aligned.
     :param im2: The reference image.
+    :param phase_correlation: Estimate the initial translation with phase
+        correlation, instead of starting ECC from the identity. This
+        recovers larger shifts, but may give slightly different offsets
+        than ECC alone. Defaults to False.
+    :param refine: Refine the translation with ECC. If False, the phase
+        correlation (or provided warp matrix) is returned directly, so
+        ``phase_correlation`` or ``warp_matrix`` should be given.
+        Defaults to True.
+    :param device: Device for grayscale preprocessing (denoising and
+        histogram equalization), either 'cpu', 'cuda', or 'auto'. 'auto'
+        uses the OpenCV CUDA module for large images when available. The
+        CUDA denoiser does not exactly reproduce CPU results.
+        Defaults to 'cpu'.
+    :param coarse_first: Estimate the translation on 4x-downsampled images
+        first (where denoising is 16x cheaper), then refine it at full
+        resolution with a short, denoising-free ECC pass. Defaults to False.
+    :param cache: Cache grayscale preprocessing by image content, so that
+        images aligned repeatedly (such as a fixed reference) are only
+        denoised once. Defaults to False.
     :return: Aligned image of im1.
     """
     import cv2
 
-    # Convert images to grayscale
-    im1_gray = cv2.cvtColor(im1, cv2.COLOR_BGR2GRAY)
-    im2_gray = cv2.cvtColor(im2, cv2.COLOR_BGR2GRAY)
+    if (coarse_first
+       and warp_matrix is None
+       and min(im1.shape[:2] + im2.shape[:2]) >= 256):
+        coarse_matrix = _find_translation_matrix(
+            cv2.pyrDown(cv2.pyrDown(im1)),
+            cv2.pyrDown(cv2.pyrDown(im2)),
+            denoise=denoise,
+            h=h,
+            block_size=block_size,
+            search_window=search_window,
+            n_iterations=n_iterations,
+            termination_eps=termination_eps,
+            phase_correlation=phase_correlation,
+            refine=refine,
+            device=device,
+            cache=cache
+        )
+        coarse_matrix[:, 2] *= 4
+        if not refine:
+            return coarse_matrix
+        return _find_translation_matrix(
+            im1,
+            im2,
+            denoise=False,
+            n_iterations=min(n_iterations, 50),
+            termination_eps=termination_eps,
+            warp_matrix=coarse_matrix,
+            device=device,
+            cache=cache
+        )
 
-    # De-noising
-    if denoise:
-        im1_gray = cv2.fastNlMeansDenoising(im1_gray, None, h, block_size, search_window)
-        im2_gray = cv2.fastNlMeansDenoising(im2_gray, None, h, block_size, search_window)
+    # Convert to grayscale, de-noise, and normalize contrast.
+    prep_kw = dict(denoise=denoise, h=h, block_size=block_size,
+                   search_window=search_window, device=device)
+    preprocess = (_cached_preprocess_for_alignment if cache
+                  else _preprocess_for_alignment)
+    im1_gray = preprocess(im1, **prep_kw)
+    im2_gray = preprocess(im2, **prep_kw)
+
+    # Define 2x3 matrix to store the transformation, seeding it with
+    # the phase correlation estimate when possible.
+    if warp_matrix is None and phase_correlation and im1_gray.shape == im2_gray.shape:
+        warp_matrix = _phase_correlation_matrix(im1_gray, im2_gray)
+    elif warp_matrix is None:
+        warp_matrix = np.eye(2, 3, dtype=np.float32)
+    else:
+        warp_matrix = np.asarray(warp_matrix, dtype=np.float32)
 
-    # Transform images to normalize contrast
-    im1_gray = cv2.equalizeHist(im1_gray)
-    im2_gray = cv2.equalizeHist(im2_gray)
+    if not refine:
+        return warp_matrix
 
     # Define the motion model
     warp_mode = cv2.MOTION_TRANSLATION
 
-    # Define 2x3 matrix to store the transformation
-    if warp_matrix is None:
-        warp_matrix = np.eye(2, 3, dtype=np.float32)
-
     # Set the number of iterations and termination criteria
     criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, n_iterations, termination_eps)
 
@@ -248,6 +496,138 @@ def align_image(im1: np.ndarray, im2: np.ndarray) -> np.ndarray:
     return _align_to_matrix(im1, im2, warp_matrix)
 
 
+def _alignment_error() -> errors.AlignmentError:
+    return errors.AlignmentError(
+        "Could not align images. Check that the images are the same "
+        "size, that they are not rotated or flipped, and that they have "
+        "overlapping regions."
+    )
+
+
+def _matrix_to_alignment(
+    warp_matrix: np.ndarray,
+    round: bool = False
+) -> Union[Tuple[float, float], Tuple[int, int]]:
+    alignment = -warp_matrix[0, 2], -warp_matrix[1, 2]
+    if round:
+        alignment = (int(np.round(alignment[0])), int(np.round(alignment[1])))
+    return alignment
+
+
+def _attach_shared_memory(name: str):
+    """Attach to a shared memory block owned by the parent process.
+
+    The parent unlinks the block. On Python 3.13+, the worker attaches
+    without tracking. On older versions, spawned workers share the parent's
+    resource tracker, which already holds the block's registration, so the
+    worker's registration is left in place; the parent's unlink clears it.
+    """
+    from multiprocessing import shared_memory
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _batch_alignment_worker(
+    spec1: Tuple[str, Tuple[int, ...], str],
+    spec2: Tuple[str, Tuple[int, ...], str],
+    kwargs: dict
+) -> Optional[np.ndarray]:
+    """Find a translation matrix between two images in shared memory."""
+    import cv2
+
+    shm1 = _attach_shared_memory(spec1[0])
+    try:
+        shm2 = _attach_shared_memory(spec2[0])
+    except BaseException:
+        shm1.close()
+        raise
+    try:
+        im1 = np.ndarray(spec1[1], dtype=spec1[2], buffer=shm1.buf)
+        im2 = np.ndarray(spec2[1], dtype=spec2[2], buffer=shm2.buf)
+        try:
+            return _find_translation_matrix(im1, im2, **kwargs)
+        except cv2.error:
+            return None
+        finally:
+            # Views must be released before the blocks can be closed.
+            del im1, im2
+    finally:
+        shm1.close()
+        shm2.close()
+
+
+def batch_align_by_translation(
+    pairs: List[Tuple[np.ndarray, np.ndarray]],
+    round: bool = False,
+    workers: Optional[int] = None,
+    **kwargs
+) -> List[Union[Tuple[float, float], Tuple[int, int]]]:
+    """
+    Find the (x, y) translation for many image pairs in parallel.
+
+    Images are copied once into shared memory (images reused across pairs,
+    such as a common reference, are only copied once), and each pair is
+    aligned in a separate spawned process.
+
+    Args:
+        pairs (list(tuple(np.ndarray, np.ndarray))): List of (im1, im2)
+            pairs, as passed to :func:`align_by_translation`.
+        round (bool): Round to the nearest int. Defaults to False.
+        workers (int, optional): Number of worker processes. Defaults to the
+            number of CPU cores.
+        **kwargs: Passed to the translation search.
+
+    Returns:
+        List of (x, y) alignments, in the same order as ``pairs``.
+
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context, shared_memory
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(pairs))
+    if workers <= 1:
+        return [align_by_translation(im1, im2, round=round, **kwargs)
+                for im1, im2 in pairs]
+
+    blocks = []
+    specs = {}
+
+    def _share(arr):
+        if id(arr) not in specs:
+            src = np.ascontiguousarray(arr)
+            shm = shared_memory.SharedMemory(create=True,
+                                             size=max(src.nbytes, 1))
+            blocks.append(shm)
+            np.ndarray(src.shape, dtype=src.dtype, buffer=shm.buf)[...] = src
+            specs[id(arr)] = (shm.name, src.shape, src.dtype.str)
+        return specs[id(arr)]
+
+    try:
+        shared_pairs = [(_share(im1), _share(im2)) for im1, im2 in pairs]
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=get_context('spawn')) as pool:
+            futures = [
+                pool.submit(_batch_alignment_worker, spec1, spec2, kwargs)
+                for spec1, spec2 in shared_pairs
+            ]
+            matrices = [f.result() for f in futures]
+    finally:
+        for shm in blocks:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    if any(m is None for m in matrices):
+        raise _alignment_error()
+    return [_matrix_to_alignment(m, round=round) for m in matrices]
+
+
 def align_by_translation(
     im1: np.ndarray,
     im2: np.ndarray,
@@ -265,20 +645,21 @@ def align_by_translation(
         round (bool): Round to the nearest int. Defaults to False.
         calculate_mse (bool): Return the mean squared error (MSE) of alignment.
             Defaults to False.
+        **kwargs: Passed to the translation search. Set
+            ``phase_correlation=True`` to seed ECC with an FFT phase
+            correlation estimate, and additionally ``refine=False`` to use
+            that estimate without ECC refinement, which is much faster when
+            only integer shifts are needed. Set
+            ``cache=True`` to reuse results when the same images are
+            aligned repeatedly.
 
     """
     import cv2
     try:
-        warp_matrix = _find_translation_matrix(im1, im2, **kwargs)
+        warp_matrix = _cached_find_translation_matrix(im1, im2, **kwargs)
     except cv2.error:
-        raise errors.AlignmentError(
-            "Could not align images. Check that the images are the same "
-            "size, that they are not rotated or flipped, and that they have "
-            "overlapping regions."
-        )
-    alignment = -warp_matrix[0, 2], -warp_matrix[1, 2]
-    if round:
-        alignment = (int(np.round(alignment[0])), int(np.round(alignment[1])))
+        raise _alignment_error()
+    alignment = _matrix_to_alignment(warp_matrix, round=round)
 
     if calculate_mse:
         aligned_im1 = _align_to_matrix(im1, im2, warp_matrix)
@@ -287,6 +668,30 @@ def align_by_translation(
     else:
         return alignment
 
+@lru_cache(maxsize=None)
+def _get_mse_kernel() -> Optional[Callable]:
+    """Compile (once) a fused masked-MSE kernel with Numba, if available."""
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _mse_kernel(a, b):
+        total = 0.0
+        count = 0
+        for i in prange(a.shape[0]):
+            if a[i] != 0 and b[i] != 0:
+                d = float(a[i]) - float(b[i])
+                total += d * d
+                count += 1
+        if count == 0:
+            return np.nan
+        return total / count
+
+    return _mse_kernel
+
+
 def compute_alignment_mse(
     imageA: np.ndarray,
     imageB: np.ndarray,
@@ -296,23 +701,33 @@ def compute_alignment_mse(
     Compute the Mean Squared Error between two images in their overlapping region,
     excluding areas that are black (0, 0, 0) in either image.
 
+    If Numba is available, masking, squared differences and the reduction
+    are fused into a single parallel pass over the images.
+
     :param imageA: First image.
     :param imageB: Second image.
     :return: Mean Squared Error (MSE) between the images in the valid overlapping region.
     """
     # Remove the alpha channel from both images
-    if flatten:
+    if flatten and imageA.ndim == 3:
         imageA = imageA[:, :, 0:3]
         imageB = imageB[:, :, 0:3]
 
     assert imageA.shape == imageB.shape, "Image sizes must match."
 
+    kernel = _get_mse_kernel()
+    if kernel is not None:
+        return kernel(np.ascontiguousarray(imageA).ravel(),
+                      np.ascontiguousarray(imageB).ravel())
+
     # Create a combined mask where neither of the images is black
-    combined_mask = np.logical_not(np.logical_or(imageA == 0, imageB == 0))
+    combined_mask = (imageA != 0) & (imageB != 0)
 
-    # Compute MSE only for valid regions
-    diff = (imageA.astype("float") - imageB.astype("float")) ** 2
-    err = np.sum(diff[combined_mask]) / np.sum(combined_mask)
+    # Compute MSE only for valid regions, in place to avoid temporaries
+    diff = np.subtract(imageA, imageB, dtype=np.float32)
+    np.square(diff, out=diff)
+    np.multiply(diff, combined_mask, out=diff)
+    err = diff.sum(dtype=np.float64) / np.count_nonzero(combined_mask)
 
     return err
 
@@ -322,15 +737,14 @@ def alignment_to_list(grid):
         raise ValueError("Input should be a numpy masked array.")
 
     # Extract valid (unmasked) indices
-    valid_indices = np.ma.where(~grid.mask)
+    valid_indices = np.nonzero(~np.ma.getmaskarray(grid))
 
-    # Get the values from these indices
-    valid_values = grid[valid_indices]
+    # Get the values from these indices, bypassing MaskedArray indexing
+    valid_values = grid.data[valid_indices]
 
     # Stack the indices and values
-    result = np.column_stack(valid_indices + (valid_values,))
-
-    return result
+    dtype = np.result_type(valid_indices[0].dtype, valid_values.dtype)
+    return np.stack(valid_indices + (valid_values,), axis=1).astype(dtype, copy=False)
 
 
 def best_fit_plane(points):
@@ -341,14 +755,11 @@ def best_fit_plane(points):
     centroid = points.mean(axis=0)
     centered_points = points - centroid
 
-    # 2. Compute the covariance matrix
-    cov_matrix = np.cov(centered_points, rowvar=False)
-
-    # 3. Compute the eigenvalues and eigenvectors
-    eigenvalues, eigenvectors = np.linalg.eigh(cov_matrix)
-
-    # 4. Get the eigenvector corresponding to the smallest eigenvalue
-    normal_vector = eigenvectors[:, np.argmin(eigenvalues)]
+    # 2. The plane normal is the right singular vector of the centered points
+    # with the smallest singular value (singular values are sorted in
+    # descending order). This avoids forming the covariance matrix.
+    _, _, vt = np.linalg.svd(centered_points, full_matrices=False)
+    normal_vector = vt[-1]
 
     # The equation of the plane is `normal_vector . (x - centroid) = 0`
     return centroid, normal_vector
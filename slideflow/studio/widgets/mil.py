@@ -170,7 +170,9 @@ class MILWidget(Widget):
             self.mil_params = _get_mil_params(path)
             self.extractor_params = self.mil_params['bags_extractor']
             self._reload_wsi()
-            self.model, self.mil_config = sf.mil.utils.load_model_weights(path)
+            self.model, self.mil_config = sf.mil.utils.load_model_weights(
+                path, fuse=True
+            )
             self.viz.close_model(True)  # Close a tile-based model, if one is loaded
             self.viz.tile_um = self.extractor_params['tile_um']
             self.viz.tile_px = self.extractor_params['tile_px']
@@ -0,0 +1,123 @@
+import subprocess
+import sys
+import textwrap
+import unittest
+
+import numpy as np
+import slideflow as sf
+from slideflow.slide.utils import align_by_translation
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None  # type: ignore
+
+
+@unittest.skipIf(cv2 is None, "OpenCV not installed")
+class TestAlignment(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._orig_logging_level = sf.getLoggingLevel()  # type: ignore
+        sf.setLoggingLevel(40)
+        # Smooth, random texture, from which shifted crops are taken.
+        rng = np.random.default_rng(0)
+        noise = rng.random((320, 320, 3)).astype(np.float32) * 255
+        cls.base = cv2.GaussianBlur(noise, (0, 0), 4)  # type: ignore
+        cls.base = cv2.normalize(  # type: ignore
+            cls.base, None, 0, 255, cv2.NORM_MINMAX
+        ).astype(np.uint8)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        sf.setLoggingLevel(cls._orig_logging_level)  # type: ignore
+
+    def _shifted_pair(self, shift):
+        """Return (moved, reference) crops, with moved offset by (x, y)."""
+        x, y = shift
+        ref = self.base[32:288, 32:288]
+        moved = self.base[32+y:288+y, 32+x:288+x]
+        return np.ascontiguousarray(moved), np.ascontiguousarray(ref)
+
+    def _assert_recovers(self, shift, **kwargs):
+        moved, ref = self._shifted_pair(shift)
+        alignment = align_by_translation(moved, ref, **kwargs)
+        self.assertTrue(
+            np.allclose(alignment, shift, atol=1),
+            f"Expected {shift}, got {alignment} with {kwargs}"
+        )
+
+    def test_default(self):
+        # ECC only, without phase correlation.
+        self._assert_recovers((3, -2))
+
+    def test_phase_correlation(self):
+        self._assert_recovers((12, -7), phase_correlation=True)
+
+    def test_phase_correlation_only(self):
+        self._assert_recovers((12, -7), phase_correlation=True, refine=False)
+
+    def test_coarse_first(self):
+        self._assert_recovers(
+            (12, -7), phase_correlation=True, coarse_first=True
+        )
+
+    def test_coarse_first_without_refine(self):
+        # Coarse estimates are scaled from 4x-downsampled images.
+        moved, ref = self._shifted_pair((12, -8))
+        alignment = align_by_translation(
+            moved, ref, phase_correlation=True, coarse_first=True,
+            refine=False
+        )
+        self.assertTrue(np.allclose(alignment, (12, -8), atol=4))
+
+    def test_cached(self):
+        moved, ref = self._shifted_pair((12, -7))
+        first = align_by_translation(
+            moved, ref, phase_correlation=True, cache=True
+        )
+        second = align_by_translation(
+            moved.copy(), ref.copy(), phase_correlation=True, cache=True
+        )
+        self.assertEqual(first, second)
+        self.assertTrue(np.allclose(first, (12, -7), atol=1))
+
+    def test_batch_shared_memory_cleanup(self):
+        # Workers attach to the parent's shared memory. Neither the workers
+        # nor the parent should trigger resource tracker errors or warnings.
+        script = textwrap.dedent("""
+            import cv2
+            import numpy as np
+            from slideflow.slide.utils import batch_align_by_translation
+
+            rng = np.random.default_rng(0)
+            noise = rng.random((320, 320, 3)).astype(np.float32) * 255
+            base = cv2.normalize(
+                cv2.GaussianBlur(noise, (0, 0), 4), None, 0, 255,
+                cv2.NORM_MINMAX
+            ).astype(np.uint8)
+            ref = np.ascontiguousarray(base[32:288, 32:288])
+            shifts = [(12, -7), (-5, 9), (3, 3), (0, -10)]
+            pairs = [
+                (np.ascontiguousarray(base[32+y:288+y, 32+x:288+x]), ref)
+                for x, y in shifts
+            ]
+            result = batch_align_by_translation(
+                pairs, round=True, workers=2, phase_correlation=True
+            )
+            assert np.allclose(result, shifts, atol=1), result
+        """)
+        proc = subprocess.run(
+            [sys.executable, '-c', script],
+            capture_output=True,
+            text=True,
+            timeout=300
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stderr.strip(), '')
+
+# -----------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    unittest.main()
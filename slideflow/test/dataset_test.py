@@ -1,7 +1,13 @@
+import copy
+import json
 import logging
+import os
 import random
 import shutil
+import sys
+import tempfile
 import unittest
+from unittest import mock
 
 import pandas as pd
 import slideflow as sf
@@ -84,6 +90,91 @@ class TestDataset(unittest.TestCase):
         self.assertFalse(dataset.is_float('category1'))
         self.assertFalse(dataset.is_float('category2'))
 
+    def test_filter_copy_leaves_original(self):
+        dataset = self.PROJECT.dataset()
+        all_slides = dataset.slides()
+        filtered = dataset.filter(filters={'category1': ['A']})
+        filtered = filtered.filter(filter_blank='category2')
+        self.assertTrue(len(filtered.slides()) < len(all_slides))
+        self.assertFalse(dataset.filters)
+        self.assertFalse(dataset.filter_blank)
+        self.assertEqual(dataset.slides(), all_slides)
+
+    def test_copy_filter_values_are_independent(self):
+        dataset = self.PROJECT.dataset().filter(filters={'category1': ['A']})
+        n_slides = len(dataset.slides())
+        other = copy.copy(dataset)
+        other._filters['category1'].append('B')
+        self.assertEqual(dataset.filters, {'category1': ['A']})
+        self.assertEqual(len(dataset.slides()), n_slides)
+
+    def test_labels_cache_keyed_by_filters(self):
+        dataset = self.PROJECT.dataset()
+        filtered = dataset.filter(filters={'category1': ['A']})
+        filtered_labels = filtered._categorical_labels('category1')
+        all_labels = dataset._categorical_labels('category1')
+        self.assertEqual(set(filtered_labels), set(filtered.slides()))
+        self.assertEqual(set(all_labels), set(dataset.slides()))
+        self.assertTrue(len(filtered_labels) < len(all_labels))
+
+    def test_labels_cache_reset_on_load_annotations(self):
+        dataset = self.PROJECT.dataset()
+        before = dataset._categorical_labels('category1')
+        other = copy.copy(dataset)
+        ann = dataset.annotations.copy()
+        ann['category1'] = ann['category1'].map({'A': 'B', 'B': 'A'})
+        other.load_annotations(ann)
+        after = other._categorical_labels('category1')
+        for slide, label in before.items():
+            self.assertNotEqual(after[slide], label)
+        self.assertEqual(dataset._categorical_labels('category1'), before)
+
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'manifest.json')
+        sf.dataset._MANIFEST_CACHE.pop(self.path, None)
+
+    def tearDown(self):
+        sf.dataset._MANIFEST_CACHE.pop(self.path, None)
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, manifest):
+        with open(self.path, 'w') as f:
+            json.dump(manifest, f)
+
+    def test_rewrite_within_same_mtime(self):
+        self._write({'a.tfrecords': {'total': 10}})
+        mtime_ns = os.stat(self.path).st_mtime_ns
+        self.assertEqual(sf.dataset._load_manifest(self.path),
+                         {'a.tfrecords': {'total': 10}})
+        # Rewrite with different contents, keeping the same mtime.
+        self._write({'a.tfrecords': {'total': 10}, 'b.tfrecords': {'total': 5}})
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+        self.assertEqual(sf.dataset._load_manifest(self.path),
+                         {'a.tfrecords': {'total': 10},
+                          'b.tfrecords': {'total': 5}})
+
+    def test_returns_copies(self):
+        self._write({'a.tfrecords': {'total': 10}})
+        manifest = sf.dataset._load_manifest(self.path)
+        manifest['a.tfrecords']['total'] = 0
+        self.assertEqual(sf.dataset._load_manifest(self.path),
+                         {'a.tfrecords': {'total': 10}})
+
+    def test_json_and_orjson_match(self):
+        self._write({'a.tfrecords': {'total': 10, 'clipped': 3},
+                     'dir/b.tfrecords': {'total': 0}})
+        loaded = sf.dataset._load_manifest(self.path)
+        sf.dataset._MANIFEST_CACHE.pop(self.path, None)
+        # Setting a module to None makes importing it raise ImportError.
+        with mock.patch.dict(sys.modules, {'orjson': None}):
+            loaded_json = sf.dataset._load_manifest(self.path)
+        self.assertEqual(loaded, loaded_json)
+        self.assertEqual(loaded_json, sf.util.load_json(self.path))
+
 
 class TestSplits(unittest.TestCase):
 
@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+import slideflow as sf
+
+try:
+    import tensorflow as tf
+    from slideflow.io.tensorflow import (_is_batch_safe, _random_rot90_batch,
+                                         process_image)
+except ImportError:
+    tf = None  # type: ignore
+
+
+@unittest.skipIf(tf is None, "Tensorflow not installed")
+class TestTensorflowAugmentation(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._orig_logging_level = sf.getLoggingLevel()  # type: ignore
+        sf.setLoggingLevel(40)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        sf.setLoggingLevel(cls._orig_logging_level)  # type: ignore
+
+    def setUp(self):
+        tf.random.set_seed(0)
+        # A square image with no rotational or mirror symmetry.
+        self.image = tf.constant(
+            np.random.default_rng(0).integers(0, 256, (8, 8, 3)),
+            dtype=tf.uint8
+        )
+        self.batch = tf.stack([self.image] * 64)
+
+    def _dihedral(self, image):
+        """All 8 flips and rotations of an image."""
+        rotations = [tf.image.rot90(image, k) for k in range(4)]
+        return rotations + [tf.image.flip_left_right(r) for r in rotations]
+
+    def _assert_each_in(self, batch, candidates):
+        candidates = [c.numpy() for c in candidates]
+        found = set()
+        for image in batch.numpy():
+            matches = [i for i, c in enumerate(candidates)
+                       if np.allclose(image, c, atol=1e-5)]
+            self.assertTrue(matches, "Image is not a valid augmentation")
+            found.add(matches[0])
+        return found
+
+    def test_is_batch_safe(self):
+        for augment in (False, '', 'x', 'y', 'r', 'xyr', 'xyrn'):
+            self.assertTrue(_is_batch_safe(augment), augment)
+        for augment in (True, 'j', 'b', 'xyrj', 'xyrb', 'xyrjb'):
+            self.assertFalse(_is_batch_safe(augment), augment)
+        self.assertFalse(_is_batch_safe('xyr', transform=lambda x: x))
+
+    def test_random_rot90_batch(self):
+        rotated = _random_rot90_batch(self.batch)
+        rotations = [tf.image.rot90(self.image, k) for k in range(4)]
+        found = self._assert_each_in(rotated, rotations)
+        # With 64 images, every rotation should be drawn.
+        self.assertEqual(found, {0, 1, 2, 3})
+
+    def test_batched_matches_per_image(self):
+        for augment in ('x', 'y', 'r', 'xyr', 'xyrn'):
+            batched = process_image(
+                self.batch, augment=augment, standardize=True, size=8
+            )[0]
+            self.assertEqual(batched.shape, (64, 8, 8, 3))
+            # Every batched output must be an output that per-image
+            # augmentation could produce.
+            candidates = [
+                process_image(t, standardize=True, size=8)[0]
+                for t in self._dihedral(self.image)
+            ]
+            self._assert_each_in(batched, candidates)
+
+    def test_batched_standardization_is_per_image(self):
+        batch = tf.stack([self.image, self.image // 2])
+        batched = process_image(batch, standardize=True, size=8)[0]
+        for i in range(2):
+            single = process_image(batch[i], standardize=True, size=8)[0]
+            self.assertTrue(np.allclose(batched[i], single, atol=1e-5))
+
+# -----------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    unittest.main()
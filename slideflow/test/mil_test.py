@@ -0,0 +1,222 @@
+import unittest
+
+import slideflow as sf
+
+try:
+    import torch
+    from slideflow.mil.models.att_mil import (_HAS_SEGMENT_REDUCE,
+                                              Attention_MIL,
+                                              MultiModal_Attention_MIL,
+                                              masked_softmax)
+except ImportError:
+    torch = None  # type: ignore
+    _HAS_SEGMENT_REDUCE = False
+
+# -----------------------------------------------------------------------------
+
+def _random_bags(bs, bag_size, n_feats, lens):
+    """Random padded bags, with zeros after the last valid instance."""
+    bags = torch.rand(bs, bag_size, n_feats)
+    lens = torch.tensor(lens)
+    for i, n in enumerate(lens.tolist()):
+        bags[i, n:] = 0
+    return bags, lens
+
+
+@unittest.skipIf(torch is None, "PyTorch not installed")
+class TestAttentionMIL(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._orig_logging_level = sf.getLoggingLevel()  # type: ignore
+        sf.setLoggingLevel(40)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        sf.setLoggingLevel(cls._orig_logging_level)  # type: ignore
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.bags, self.lens = _random_bags(4, 10, 16, [1, 10, 3, 7])
+
+    def _model_with_running_stats(self):
+        model = Attention_MIL(16, 3, z_dim=8)
+        # Update the BatchNorm running statistics away from their defaults.
+        model.train()
+        with torch.no_grad():
+            for _ in range(5):
+                model(*_random_bags(4, 10, 16, [2, 10, 5, 8]))
+        return model.eval()
+
+    def _reference_weighted_sums(self, model, bags, lens):
+        """Softmax-weighted embedding sums over each bag's valid instances."""
+        sums = []
+        for bag, n in zip(bags, lens.tolist()):
+            emb = model.encoder(bag[:n])
+            weights = torch.softmax(model.attention(emb), dim=0)
+            sums.append((weights * emb).sum(0))
+        return torch.stack(sums)
+
+    def test_masked_softmax(self):
+        scores = torch.randn(4, 10, 1)
+        weights = masked_softmax(scores.clone(), self.lens)
+        for i, n in enumerate(self.lens.tolist()):
+            self.assertTrue(torch.allclose(
+                weights[i, :n, 0], torch.softmax(scores[i, :n, 0], dim=0)
+            ))
+            self.assertTrue(torch.all(weights[i, n:] == 0))
+
+    def test_masked_softmax_inplace(self):
+        scores = torch.randn(4, 10, 1)
+        expected = masked_softmax(scores.clone(), self.lens)
+        weights = masked_softmax(scores, self.lens, inplace=True)
+        self.assertTrue(torch.equal(weights, expected))
+        self.assertTrue(torch.all(scores[0, 1:] == -torch.inf))
+
+    def test_backward_custom_attention(self):
+        # Tanh saves its output for backward, so its scores must not be
+        # masked in place.
+        attention = torch.nn.Sequential(torch.nn.Linear(8, 1), torch.nn.Tanh())
+        model = Attention_MIL(16, 3, z_dim=8, attention=attention)
+        model(self.bags, self.lens).sum().backward()
+        self.assertIsNotNone(attention[0].weight.grad)
+
+    @unittest.skipIf(not _HAS_SEGMENT_REDUCE, "Requires PyTorch 1.12+")
+    def test_packed_weighted_sums(self):
+        model = Attention_MIL(16, 3, z_dim=8).eval()
+        with torch.no_grad():
+            packed = model._packed_weighted_sums(self.bags, self.lens)
+            expected = self._reference_weighted_sums(model, self.bags, self.lens)
+        self.assertTrue(torch.allclose(packed, expected, atol=1e-6))
+
+    @unittest.skipIf(not _HAS_SEGMENT_REDUCE, "Requires PyTorch 1.12+")
+    def test_packed_forward_matches_padded(self):
+        model = self._model_with_running_stats()
+        with torch.no_grad():
+            packed = model(self.bags, self.lens)
+            model._packable = False
+            padded = model(self.bags, self.lens)
+        self.assertTrue(torch.allclose(packed, padded, atol=1e-5))
+
+    @unittest.skipIf(not _HAS_SEGMENT_REDUCE, "Requires PyTorch 1.12+")
+    def test_packed_gradients_match_padded(self):
+        model = Attention_MIL(16, 3, z_dim=8).eval()
+        grads = []
+        for packable in (True, False):
+            model.zero_grad()
+            model._packable = packable
+            model(self.bags, self.lens).sum().backward()
+            grads.append([p.grad.clone() for p in model.parameters()])
+        for packed, padded in zip(*grads):
+            self.assertTrue(torch.allclose(packed, padded, atol=1e-5))
+
+    def test_fuse_for_inference(self):
+        model = self._model_with_running_stats()
+        with torch.no_grad():
+            expected = model(self.bags, self.lens)
+            model.fuse_for_inference()
+            fused = model(self.bags, self.lens)
+        self.assertIsInstance(model.head[0], torch.nn.Identity)
+        self.assertTrue(torch.allclose(expected, fused, atol=1e-5))
+
+    def test_fuse_requires_eval(self):
+        model = Attention_MIL(16, 3, z_dim=8)
+        with self.assertRaises(RuntimeError):
+            model.fuse_for_inference()
+
+    def test_load_legacy_head_keys(self):
+        model = self._model_with_running_stats()
+        # Weights saved before the head's leading Flatten was removed.
+        legacy = {}
+        for key, value in model.state_dict().items():
+            key = key.replace('head.0.', 'head.1.').replace('head.2.', 'head.3.')
+            legacy[key] = value
+        self.assertIn('head.1.running_mean', legacy)
+        loaded = Attention_MIL(16, 3, z_dim=8)
+        loaded.load_state_dict(legacy, strict=True)
+        loaded.eval()
+        with torch.no_grad():
+            self.assertTrue(torch.allclose(
+                model(self.bags, self.lens), loaded(self.bags, self.lens)
+            ))
+
+
+@unittest.skipIf(torch is None, "PyTorch not installed")
+class TestMultiModalAttentionMIL(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._orig_logging_level = sf.getLoggingLevel()  # type: ignore
+        sf.setLoggingLevel(40)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        sf.setLoggingLevel(cls._orig_logging_level)  # type: ignore
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.inputs = (
+            _random_bags(4, 10, 16, [1, 10, 3, 7]),
+            _random_bags(4, 6, 12, [6, 2, 1, 4]),
+        )
+
+    def _reference_weighted_embeddings(self, model, inputs):
+        """Per-magnification attention pooling with a padded softmax."""
+        weighted = []
+        for i, (bags, lens) in enumerate(inputs):
+            emb = model.encoders[i](bags)
+            scores = model.attentions[i](emb)
+            idx = torch.arange(bags.shape[1]).repeat(bags.shape[0], 1)
+            mask = (idx < lens.unsqueeze(-1)).unsqueeze(-1)
+            scores = torch.where(mask, scores, torch.tensor(-torch.inf))
+            weights = torch.softmax(scores, dim=1)
+            weighted.append(model.preheads[i](torch.sum(weights * emb, dim=1)))
+        return weighted
+
+    def test_grouped_embeddings(self):
+        model = MultiModal_Attention_MIL([16, 16], 3, z_dim=8).eval()
+        bags = (self.inputs[0][0], torch.rand(4, 10, 16))
+        with torch.no_grad():
+            grouped = model._calculate_grouped_embeddings(bags)
+            expected = [enc(b) for enc, b in zip(model.encoders, bags)]
+        for g, e in zip(grouped, expected):
+            self.assertTrue(torch.allclose(g, e, atol=1e-6))
+
+    def test_forward_matches_reference(self):
+        model = MultiModal_Attention_MIL([16, 12], 3, z_dim=8).eval()
+        with torch.no_grad():
+            output = model(*self.inputs)
+            expected = model.head(torch.cat(
+                self._reference_weighted_embeddings(model, self.inputs), dim=1
+            ))
+        self.assertTrue(torch.allclose(output, expected, atol=1e-5))
+
+    def test_load_legacy_keys(self):
+        model = MultiModal_Attention_MIL([16, 12], 3, z_dim=8).eval()
+        # Weights saved with per-magnification attributes, and preheads
+        # with a leading Flatten layer.
+        legacy = {}
+        for key, value in model.state_dict().items():
+            parts = key.split('.')
+            if parts[0] in ('encoders', 'attentions', 'preheads'):
+                name = parts[0][:-1] + '_' + parts[1]
+                if parts[0] == 'preheads':
+                    parts[2] = str(int(parts[2]) + 1)
+                key = '.'.join([name] + parts[2:])
+            legacy[key] = value
+        self.assertIn('prehead_0.1.running_mean', legacy)
+        self.assertIn('encoder_1.0.weight', legacy)
+        loaded = MultiModal_Attention_MIL([16, 12], 3, z_dim=8)
+        loaded.load_state_dict(legacy, strict=True)
+        loaded.eval()
+        with torch.no_grad():
+            self.assertTrue(torch.allclose(
+                model(*self.inputs), loaded(*self.inputs)
+            ))
+
+# -----------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    unittest.main()
@@ -840,10 +840,30 @@ def get_preprocess_fn(model_path: str):
         raise ValueError(f"Unrecognized model: {model_path}")
 
 
+def _scandir_visible(directory: str) -> List[os.DirEntry]:
+    '''List non-hidden entries in a directory, or [] if it does not exist.'''
+    try:
+        with os.scandir(directory) as entries:
+            return [e for e in entries if not e.name.startswith('.')]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
 def get_slide_paths(slides_dir: str) -> List[str]:
-    '''Get all slide paths from a given directory containing slides.'''
-    slide_list = [i for i in glob(join(slides_dir, '**/*.*')) if is_slide(i)]
-    slide_list.extend([i for i in glob(join(slides_dir, '*.*')) if is_slide(i)])
+    '''Get all slide paths from a given directory containing slides.
+
+    Searches the directory and its immediate subdirectories.
+    '''
+    def _is_slide(entry):
+        return (entry.is_file()
+                and path_to_ext(entry.name).lower() in SUPPORTED_FORMATS)
+
+    top_level = _scandir_visible(slides_dir)
+    slide_list = [
+        e.path for d in top_level if d.is_dir()
+        for e in _scandir_visible(d.path) if _is_slide(e)
+    ]
+    slide_list.extend([e.path for e in top_level if _is_slide(e)])
     return slide_list
 
 